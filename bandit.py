@@ -0,0 +1,71 @@
+from typing import List
+
+
+class OperatorBandit:
+    """Адаптивный выбор операторов для оценки соседних решений (многорукий бандит).
+
+    Для каждого оператора хранится оценка доли побед: доли оцененных им соседних решений, которые оказались
+    лучшими на своем шаге и были приняты (экспоненциальное скользящее среднее, поэтому оценка следует за
+    изменением успешности операторов по ходу решения). Операторы, оценка которых не ниже threshold от наибольшей,
+    активны и оцениваются на каждом шаге. Остальные операторы редко побеждают, поэтому пропускаются: только на
+    шагах исследования (с вероятностью exploration) оцениваются все операторы, чтобы заметить, что пропускаемый
+    оператор снова стал успешным. Пока все операторы активны, каждый шаг оценивает все операторы, как и без
+    адаптивного выбора. Статистика обновляется один раз за внутренний цикл (update).
+
+    Typical usage example:
+        bandit = OperatorBandit(len(tools.OPERATORS), exploration=0.1)
+        operators = bandit.active if not bandit.rare or random() >= bandit.exploration else all_operators
+        bandit.update(evaluated, wins)
+
+    Attributes:
+        exploration (float): вероятность шага исследования, на котором оцениваются все операторы
+        decay (float): вес предыдущей оценки при обновлении
+        threshold (float): доля наибольшей оценки, ниже которой оператор пропускается
+        rates (List[float]): оценки доли побед операторов
+        active (List[int]): индексы операторов, оцениваемых на каждом шаге (по возрастанию)
+        rare (List[int]): индексы операторов, оцениваемых только на шагах исследования (по возрастанию)
+    """
+    def __init__(self, operators_count: int, exploration: float = 0.1, decay: float = 0.9, threshold: float = 0.05):
+        """Инициализация статистики операторов
+
+        Args:
+            operators_count (int): количество операторов
+            exploration (float): вероятность шага исследования (0 - пропускаемые операторы больше не оцениваются,
+                1 - все операторы на каждом шаге). По умолчанию 0.1
+            decay (float): вес предыдущей оценки при обновлении. По умолчанию 0.9
+            threshold (float): доля наибольшей оценки, ниже которой оператор пропускается. По умолчанию 0.05:
+                на эталонных задачах доля побед худшего оператора не опускается ниже 10% доли лучшего, а пропуск
+                оператора при больших порогах ухудшает решение сильнее, чем ускоряет шаги
+        """
+        if not 0 <= exploration <= 1:
+            raise ValueError("Вероятность исследования должна быть в диапазоне [0, 1]")
+        self.exploration = exploration
+        self.decay = decay
+        self.threshold = threshold
+        # Пока статистики нет, все операторы считаются одинаково успешными и оцениваются на каждом шаге
+        self.rates = [1.0] * operators_count
+        self.active = list(range(operators_count))
+        self.rare: List[int] = []
+
+    def update(self, evaluated: List[int], wins: List[int]):
+        """Обновляет оценки операторов по статистике внутреннего цикла
+
+        Args:
+            evaluated (List[int]): количество соседних решений, оцененных каждым оператором
+            wins (List[int]): количество принятых ходов каждого оператора
+        """
+        for k, count in enumerate(evaluated):
+            if count:
+                self.rates[k] = self.decay * self.rates[k] + (1 - self.decay) * wins[k] / count
+        bound = self.threshold * max(self.rates)
+        self.active = [k for k, rate in enumerate(self.rates) if rate >= bound]
+        self.rare = [k for k, rate in enumerate(self.rates) if rate < bound]
+
+    def get_state(self) -> dict:
+        """Возвращает состояние (JSON-совместимый словарь)"""
+        return {"rates": list(self.rates)}
+
+    def set_state(self, state: dict):
+        """Восстанавливает состояние, полученное get_state"""
+        self.rates = list(state["rates"])
+        self.update([0] * len(self.rates), [0] * len(self.rates))
@@ -0,0 +1,140 @@
+"""Пакетное решение задач без графического интерфейса.
+
+Задания читаются из файла в формате JSON Lines: каждая строка описывает одно задание, например
+{"instance": "data/benchmarks/berlin52.tsp", "temp_len": 1500, "p0": 0.1, "outer_limit": 20000, "seed": 1}.
+Обязательно только поле instance, остальные параметры по умолчанию берутся из DEFAULT_JOB. Задания выполняются
+на пуле процессов, и результат каждого задания выводится отдельной JSON-строкой сразу после его завершения,
+поэтому долгое задание не задерживает вывод остальных.
+
+Typical usage example:
+    python batch.py jobs.jsonl --processes 4 --output results.jsonl
+"""
+import argparse
+import functools
+import json
+import multiprocessing
+import random
+import sys
+import time
+from typing import Iterator, List, Optional
+
+import instance
+import solver
+
+# Параметры задания по умолчанию
+DEFAULT_JOB = {"temp_len": 1500, "p0": 0.1, "outer_limit": 20000, "seed": None, "initial_tour": "random"}
+
+
+def read_jobs(file_name: str) -> List[dict]:
+    """Читает задания из файла в формате JSON Lines
+
+    Пустые строки пропускаются. Заданию без поля id присваивается номер его строки
+
+    Args:
+        file_name (str): путь к файлу заданий
+
+    Returns:
+        Список заданий с заполненными параметрами по умолчанию
+
+    Raises:
+        ValueError: если строка не является JSON-объектом или в задании нет поля instance
+    """
+    jobs = []
+    with open(file_name, "r") as file:
+        for line_number, line in enumerate(file, 1):
+            if not line.strip():
+                continue
+            job = json.loads(line)
+            if not isinstance(job, dict) or "instance" not in job:
+                raise ValueError(f"Строка {line_number}: задание должно быть JSON-объектом с полем instance")
+            jobs.append({"id": line_number, **DEFAULT_JOB, **job})
+
+    return jobs
+
+
+def run_job(job: dict, cache_dir: Optional[str] = instance.DEFAULT_CACHE_DIR) -> dict:
+    """Решает задачу одного задания
+
+    Args:
+        job (dict): задание (instance, temp_len, p0, outer_limit, seed, initial_tour, id)
+        cache_dir (Optional[str]): папка кэша разобранных задач (см. instance.TSP_INSTANCE). None отключает кэш.
+            По умолчанию instance.DEFAULT_CACHE_DIR
+
+    Returns:
+        Словарь с параметрами задания (включая использованное зерно) и результатами: length - длина лучшего
+        маршрута, tour - лучший маршрут, load_time и solve_time - время загрузки задачи и решения в секундах,
+        construction_time - время построения изначального маршрута в секундах (входит в solve_time).
+        Если задание завершилось ошибкой, вместо результатов возвращается ее описание (error)
+    """
+    result = dict(job)
+    try:
+        start = time.perf_counter()
+        problem = instance.TSP_INSTANCE(job["instance"], cache_dir=cache_dir)
+        result["load_time"] = time.perf_counter() - start
+
+        # Задание без зерна получает случайное зерно, которое записывается в результат для воспроизведения
+        if result["seed"] is None:
+            result["seed"] = random.SystemRandom().getrandbits(63)
+        start = time.perf_counter()
+        tsp_solver = solver.TSPSolver(
+            job["temp_len"], job["p0"], job["outer_limit"], problem.d, seed=result["seed"],
+            initial_tour=job["initial_tour"], node_list=problem.node_list
+        )
+        tour, length = tsp_solver.run()
+        result["solve_time"] = time.perf_counter() - start
+        result["construction_time"] = tsp_solver.construction_time
+        result["length"] = length
+        result["tour"] = tour
+    except Exception as error:
+        result["error"] = f"{type(error).__name__}: {error}"
+
+    return result
+
+
+def run_jobs(
+        jobs: List[dict],
+        processes: Optional[int] = None,
+        cache_dir: Optional[str] = instance.DEFAULT_CACHE_DIR
+) -> Iterator[dict]:
+    """Выполняет задания на пуле процессов
+
+    Args:
+        jobs (List[dict]): задания
+        processes (Optional[int]): количество процессов. По умолчанию os.cpu_count()
+        cache_dir (Optional[str]): папка кэша разобранных задач. None отключает кэш.
+            По умолчанию instance.DEFAULT_CACHE_DIR
+
+    Yields:
+        Результаты заданий в порядке их завершения
+    """
+    with multiprocessing.Pool(processes) as pool:
+        yield from pool.imap_unordered(functools.partial(run_job, cache_dir=cache_dir), jobs, chunksize=1)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Пакетное решение задач коммивояжера без интерфейса")
+    parser.add_argument("jobs", help="файл заданий в формате JSON Lines")
+    parser.add_argument(
+        "--processes", type=int, help="количество одновременно выполняемых заданий. По умолчанию число ядер"
+    )
+    parser.add_argument("--output", help="файл для результатов в формате JSON Lines. По умолчанию stdout")
+    parser.add_argument("--no-cache", action="store_true", help="не использовать кэш разобранных задач")
+    args = parser.parse_args(argv)
+
+    jobs = read_jobs(args.jobs)
+    output = open(args.output, "w") if args.output else sys.stdout
+    failed = 0
+    try:
+        for result in run_jobs(jobs, args.processes, None if args.no_cache else instance.DEFAULT_CACHE_DIR):
+            failed += "error" in result
+            output.write(json.dumps(result) + "\n")
+            output.flush()
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,229 @@
+"""Набор тестов производительности солвера на задачах из data/benchmarks.
+
+Каждый запуск (задача, набор параметров, зерно) выполняется в отдельном процессе, что позволяет измерить пиковое
+потребление памяти запуска. Результаты сохраняются в JSON-файл и могут быть сравнены с результатами
+предыдущего запуска для поиска регрессий.
+
+Typical usage example:
+    python benchmark.py --params 1500,0.1,2000 --seeds 1 2 3 --output results.json
+    python benchmark.py --compare results.json --output new_results.json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from typing import List, Optional
+
+try:
+    import resource
+except ImportError:  # модуль resource есть только в Unix
+    resource = None
+
+import instance
+import solver
+from metrics import SolverMetrics
+
+BENCHMARKS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "benchmarks")
+
+
+def run_benchmark(task: tuple, cache_dir: Optional[str] = instance.DEFAULT_CACHE_DIR) -> dict:
+    """Выполняет один запуск солвера и возвращает его результаты
+
+    Args:
+        task (tuple): путь к задаче, (temp_len, p0, outer_limit), зерно, оптимум и пороги отклонения (в процентах)
+        cache_dir (Optional[str]): папка кэша разобранных задач (см. instance.TSP_INSTANCE). None отключает кэш.
+            По умолчанию instance.DEFAULT_CACHE_DIR
+
+    Returns:
+        Словарь с результатами запуска
+    """
+    file_name, (temp_len, p0, outer_limit), seed, optimum, within = task
+    start = time.perf_counter()
+    problem = instance.TSP_INSTANCE(file_name, cache_dir=cache_dir)
+    load_time = time.perf_counter() - start
+
+    # Время (от начала решения, без загрузки задачи) достижения решения, отличающегося от оптимума не более чем
+    # на within процентов
+    time_to_within = {str(percent): None for percent in within}
+    tsp_solver = None
+
+    def track(outer_cntr, metrics):
+        if optimum is None:
+            return
+        best = tsp_solver.best
+        for percent in within:
+            if time_to_within[str(percent)] is None and best <= optimum * (1 + percent / 100):
+                time_to_within[str(percent)] = time.perf_counter() - start
+
+    metrics = SolverMetrics(callback=track, temperature_stats_every=max(1, outer_limit))
+    start = time.perf_counter()
+    tsp_solver = solver.TSPSolver(temp_len, p0, outer_limit, problem.d, metrics=metrics, seed=seed)
+    _, best = tsp_solver.run()
+    solve_time = sum(metrics.phase_time.values())
+    outer_loop_time = metrics.phase_time["outer_loop"]
+
+    return {
+        "instance": os.path.splitext(os.path.basename(file_name))[0],
+        "temp_len": temp_len,
+        "p0": p0,
+        "outer_limit": outer_limit,
+        "seed": seed,
+        "length": best,
+        "optimum": optimum,
+        "gap": (best - optimum) / optimum * 100 if optimum else None,
+        "load_time": load_time,
+        "solve_time": solve_time,
+        "moves_per_sec": metrics.moves_evaluated / outer_loop_time if outer_loop_time > 0 else None,
+        "time_to_within": time_to_within,
+        # ru_maxrss в Linux измеряется в килобайтах; без модуля resource (Windows) память не измеряется
+        "peak_memory_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource is not None else None,
+    }
+
+
+def run_suite(
+        instances: List[str],
+        params: List[tuple],
+        seeds: List[int],
+        within: List[float],
+        processes: int = 1
+) -> List[dict]:
+    """Выполняет все запуски (задача x набор параметров x зерно)
+
+    Каждый запуск выполняется в новом процессе (spawn, maxtasksperchild=1), чтобы измерения памяти и времени
+    одного запуска не зависели от остальных
+
+    Args:
+        instances (List[str]): пути к задачам
+        params (List[tuple]): наборы параметров (temp_len, p0, outer_limit)
+        seeds (List[int]): зерна
+        within (List[float]): пороги отклонения от оптимума в процентах для измерения времени их достижения
+        processes (int): количество одновременно выполняемых запусков. По умолчанию 1
+
+    Returns:
+        Список результатов запусков
+    """
+    optimums = instance.read_optimal_solutions()
+    tasks = [
+        (file_name, param, seed, optimums.get(os.path.splitext(os.path.basename(file_name))[0]), within)
+        for file_name in instances for param in params for seed in seeds
+    ]
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(processes, maxtasksperchild=1) as pool:
+        return pool.map(run_benchmark, tasks, chunksize=1)
+
+
+def result_key(result: dict) -> tuple:
+    """Ключ запуска для сравнения результатов разных прогонов"""
+    return result["instance"], result["temp_len"], result["p0"], result["outer_limit"], result["seed"]
+
+
+def find_regressions(
+        results: List[dict],
+        baseline: List[dict],
+        gap_tolerance: float,
+        speed_tolerance: float
+) -> List[str]:
+    """Сравнивает результаты с предыдущим прогоном
+
+    Args:
+        results (List[dict]): результаты текущего прогона
+        baseline (List[dict]): результаты предыдущего прогона
+        gap_tolerance (float): допустимое увеличение отклонения от оптимума (в процентных пунктах)
+        speed_tolerance (float): допустимое снижение количества ходов в секунду (в процентах)
+
+    Returns:
+        Описания найденных регрессий
+    """
+    previous = {result_key(result): result for result in baseline}
+    regressions = []
+    for result in results:
+        old = previous.get(result_key(result))
+        if old is None:
+            continue
+        name = "{} {}/{}/{} seed={}".format(*result_key(result))
+        if result["gap"] is not None and old["gap"] is not None and result["gap"] > old["gap"] + gap_tolerance:
+            regressions.append(f"{name}: отклонение {old['gap']:.2f}% -> {result['gap']:.2f}%")
+        speed, old_speed = result["moves_per_sec"], old["moves_per_sec"]
+        if speed is not None and old_speed is not None and speed < old_speed * (1 - speed_tolerance / 100):
+            regressions.append(
+                f"{name}: ходов в секунду {old['moves_per_sec']:.0f} -> {result['moves_per_sec']:.0f}"
+            )
+
+    return regressions
+
+
+def format_results(results: List[dict]) -> str:
+    """Форматирует результаты в виде таблицы"""
+    lines = [
+        f"{'instance':<12}{'params':<20}{'seed':>6}{'length':>10}{'gap, %':>9}{'moves/s':>11}{'time, s':>9}"
+        f"{'memory, MB':>12}"
+    ]
+    for result in results:
+        gap = f"{result['gap']:.2f}" if result["gap"] is not None else "-"
+        speed = f"{result['moves_per_sec']:.0f}" if result["moves_per_sec"] is not None else "-"
+        memory = f"{result['peak_memory_kb'] / 1024:.1f}" if result["peak_memory_kb"] is not None else "-"
+        params = f"{result['temp_len']}/{result['p0']}/{result['outer_limit']}"
+        lines.append(
+            f"{result['instance']:<12}{params:<20}{result['seed']:>6}{result['length']:>10}{gap:>9}"
+            f"{speed:>11}{result['solve_time']:>9.2f}{memory:>12}"
+        )
+
+    return "\n".join(lines)
+
+
+def parse_params(value: str) -> tuple:
+    """Разбирает набор параметров вида temp_len,p0,outer_limit"""
+    temp_len, p0, outer_limit = value.split(",")
+    return int(temp_len), float(p0), int(outer_limit)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Тесты производительности солвера на задачах из data/benchmarks")
+    parser.add_argument("--instances", nargs="+", help="пути к задачам (по умолчанию все задачи data/benchmarks)")
+    parser.add_argument(
+        "--params", type=parse_params, action="append",
+        help="набор параметров temp_len,p0,outer_limit (можно указать несколько раз). По умолчанию 1500,0.1,2000"
+    )
+    parser.add_argument("--seeds", type=int, nargs="+", default=[1, 2, 3], help="зерна. По умолчанию 1 2 3")
+    parser.add_argument(
+        "--within", type=float, nargs="+", default=[5.0, 1.0],
+        help="пороги отклонения от оптимума (в процентах) для измерения времени их достижения. По умолчанию 5 1"
+    )
+    parser.add_argument("--processes", type=int, default=1, help="количество одновременных запусков. По умолчанию 1")
+    parser.add_argument("--output", help="JSON-файл для сохранения результатов")
+    parser.add_argument("--compare", help="JSON-файл с результатами предыдущего прогона для поиска регрессий")
+    parser.add_argument(
+        "--gap-tolerance", type=float, default=0.5,
+        help="допустимое увеличение отклонения от оптимума в процентных пунктах. По умолчанию 0.5"
+    )
+    parser.add_argument(
+        "--speed-tolerance", type=float, default=10.0,
+        help="допустимое снижение количества ходов в секунду в процентах. По умолчанию 10"
+    )
+    args = parser.parse_args(argv)
+
+    instances = args.instances or sorted(
+        os.path.join(BENCHMARKS_DIR, name) for name in os.listdir(BENCHMARKS_DIR) if name.endswith(".tsp")
+    )
+    results = run_suite(instances, args.params or [(1500, 0.1, 2000)], args.seeds, args.within, args.processes)
+    print(format_results(results))
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+
+    if args.compare:
+        with open(args.compare, "r") as file:
+            regressions = find_regressions(results, json.load(file), args.gap_tolerance, args.speed_tolerance)
+        for regression in regressions:
+            print(f"РЕГРЕССИЯ: {regression}", file=sys.stderr)
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+import math
+from typing import Iterator, List, Tuple
+
+import numpy as np
+
+
+class SpatialGrid:
+    """Равномерная сетка городов для поиска ближайших городов кольцами ячеек.
+
+    Города раскладываются по ячейкам сетки (в среднем 2 города на ячейку), а ячейки просматриваются кольцами
+    вокруг ячейки города. Любой город за пределами просмотренных колец находится дальше, чем radius * cell_size,
+    поэтому поиск можно остановить, как только найденные города не дальше этой границы (covers)
+
+    Typical usage example:
+        grid = SpatialGrid(coords)
+        for radius in itertools.count():
+            found.extend(grid.ring(grid.cell_of[city], radius))
+            if found and grid.covers(radius, nearest_distance(found)):
+                break
+
+    Attributes:
+        cells (Dict[Tuple[int, int], List[int]]): города в каждой непустой ячейке
+        cell_of (List[Tuple[int, int]]): ячейка каждого города
+        cell_size (float): размер ячейки
+        cells_per_side (int): количество ячеек по стороне сетки
+    """
+    def __init__(self, coords: np.ndarray):
+        """Раскладывает города по ячейкам
+
+        Args:
+            coords (numpy.ndarray): координаты городов размера (n, 2)
+        """
+        n = len(coords)
+        low = coords.min(axis=0)
+        extent = max(float((coords.max(axis=0) - low).max()), 1e-9)
+        self.cells_per_side = max(1, int(math.sqrt(n / 2)))
+        self.cell_size = extent / self.cells_per_side
+        cell_coords = np.minimum(((coords - low) / self.cell_size).astype(np.int64), self.cells_per_side - 1)
+        self.cell_of = [tuple(cell) for cell in cell_coords.tolist()]
+        self.cells = {}
+        for city, cell in enumerate(self.cell_of):
+            self.cells.setdefault(cell, []).append(city)
+
+    def ring(self, cell: Tuple[int, int], radius: int) -> Iterator[int]:
+        """Перебирает города в ячейках на расстоянии radius (по Чебышеву) от ячейки cell"""
+        cx, cy = cell
+        for x in range(max(cx - radius, 0), min(cx + radius, self.cells_per_side - 1) + 1):
+            ys = (cy - radius, cy + radius) if x not in (cx - radius, cx + radius) else \
+                range(cy - radius, cy + radius + 1)
+            for y in ys:
+                yield from self.cells.get((x, y), ())
+
+    def covers(self, radius: int, distance: float) -> bool:
+        """Проверяет, что за пределами колец до radius нет городов ближе distance"""
+        return distance <= radius * self.cell_size or radius >= self.cells_per_side
+
+    def remove(self, city: int):
+        """Удаляет город из его ячейки"""
+        self.cells[self.cell_of[city]].remove(city)
+
+
+def nearest_neighbors(node_list: list, k: int) -> List[List[int]]:
+    """Строит списки кандидатов: k ближайших (по евклидову расстоянию) городов для каждого города
+
+    Для каждого города ячейки сетки SpatialGrid просматриваются кольцами вокруг его ячейки, пока не найдено
+    k городов и следующее кольцо не может содержать более близкий город. Время построения близко к
+    O(n * k * log(k))
+
+    Args:
+        node_list (List[List[float]]): список координат узлов (городов)
+        k (int): количество соседей
+
+    Returns:
+        Списки соседей каждого города, упорядоченные по возрастанию расстояния
+    """
+    coords = np.asarray(node_list, dtype=np.float64)
+    n = len(coords)
+    k = min(k, n - 1)
+    if k <= 0:
+        return [[] for _ in range(n)]
+
+    grid = SpatialGrid(coords)
+    neighbors = []
+    for city in range(n):
+        found = []
+        radius = 0
+        while True:
+            found.extend(grid.ring(grid.cell_of[city], radius))
+            if len(found) > k:
+                candidates = np.array([other for other in found if other != city])
+                distances = np.hypot(*(coords[candidates] - coords[city]).T)
+                order = np.argsort(distances, kind="stable")[:k]
+                if grid.covers(radius, distances[order[-1]]):
+                    neighbors.append(candidates[order].tolist())
+                    break
+            radius += 1
+
+    return neighbors
+
+
+def nearest_neighbors_from_matrix(d, k: int) -> List[List[int]]:
+    """Строит списки кандидатов по матрице расстояний (для задач без координат)
+
+    Args:
+        d (numpy.ndarray | List[List[float]]): матрица расстояний
+        k (int): количество соседей
+
+    Returns:
+        Списки соседей каждого города, упорядоченные по возрастанию расстояния
+    """
+    d = np.asarray(d)
+    n = len(d)
+    k = min(k, n - 1)
+    neighbors = []
+    for city in range(n):
+        row = d[city].astype(np.float64)
+        row[city] = np.inf
+        nearest = np.argpartition(row, k - 1)[:k] if k > 0 else np.array([], dtype=np.int64)
+        neighbors.append(nearest[np.argsort(row[nearest], kind="stable")].tolist())
+
+    return neighbors
@@ -0,0 +1,165 @@
+import math
+from typing import List
+
+import numpy as np
+
+from candidates import SpatialGrid, nearest_neighbors
+
+
+def nearest_neighbor_tour(node_list: list, start: int = 0) -> List[int]:
+    """Строит маршрут методом ближайшего соседа: из каждого города идем в ближайший еще не посещенный
+
+    Непосещенные города хранятся в сетке candidates.SpatialGrid, а ближайший город ищется кольцами ячеек вокруг
+    текущего города, поэтому в среднем поиск не просматривает все города
+
+    Args:
+        node_list (List[List[float]]): список координат узлов (городов)
+        start (int): город, с которого начинается маршрут. По умолчанию 0
+
+    Returns:
+        Перестановка городов
+    """
+    coords = np.asarray(node_list, dtype=np.float64)
+    n = len(coords)
+    if n == 0:
+        return []
+    grid = SpatialGrid(coords)
+    points = coords.tolist()
+
+    tour = [start]
+    grid.remove(start)
+    current = start
+    for _ in range(n - 1):
+        x0, y0 = points[current]
+        best, best_distance = None, math.inf
+        radius = 0
+        while True:
+            for city in grid.ring(grid.cell_of[current], radius):
+                x1, y1 = points[city]
+                distance = (x1 - x0) ** 2 + (y1 - y0) ** 2
+                if distance < best_distance:
+                    best, best_distance = city, distance
+            if best is not None and grid.covers(radius, math.sqrt(best_distance)):
+                break
+            radius += 1
+        grid.remove(best)
+        tour.append(best)
+        current = best
+
+    return tour
+
+
+def greedy_edge_tour(node_list: list, k: int = 10) -> List[int]:
+    """Строит маршрут жадным выбором ребер: ребра берутся по возрастанию длины, если они не создают город
+    степени 3 и цикл, не проходящий через все города
+
+    Рассматриваются только ребра к k ближайшим соседям (candidates.nearest_neighbors). Оставшиеся фрагменты
+    маршрута соединяются методом ближайшего соседа по их концам
+
+    Args:
+        node_list (List[List[float]]): список координат узлов (городов)
+        k (int): количество ближайших соседей каждого города. По умолчанию 10
+
+    Returns:
+        Перестановка городов
+    """
+    coords = np.asarray(node_list, dtype=np.float64)
+    n = len(coords)
+    if n < 3:
+        return list(range(n))
+
+    neighbors = nearest_neighbors(node_list, k)
+    edges = {(min(a, b), max(a, b)) for a in range(n) for b in neighbors[a]}
+    a, b = np.array(sorted(edges)).T
+    order = np.argsort(np.hypot(*(coords[a] - coords[b]).T), kind="stable")
+
+    # Система непересекающихся множеств для проверки циклов
+    parent = list(range(n))
+
+    def find(city):
+        while parent[city] != city:
+            parent[city] = parent[parent[city]]
+            city = parent[city]
+        return city
+
+    adjacent = [[] for _ in range(n)]
+    for u, v in zip(a[order].tolist(), b[order].tolist()):
+        if len(adjacent[u]) < 2 and len(adjacent[v]) < 2:
+            root_u, root_v = find(u), find(v)
+            if root_u != root_v:
+                parent[root_u] = root_v
+                adjacent[u].append(v)
+                adjacent[v].append(u)
+
+    # Выделение фрагментов (путей) и их концов
+    fragments, visited = [], [False] * n
+    for city in range(n):
+        if visited[city] or len(adjacent[city]) == 2:
+            continue
+        path, previous = [city], None
+        visited[city] = True
+        while True:
+            following = [other for other in adjacent[path[-1]] if other != previous]
+            if not following:
+                break
+            previous = path[-1]
+            path.append(following[0])
+            visited[following[0]] = True
+        fragments.append(path)
+
+    # Соединение фрагментов: от конца текущего фрагмента к ближайшему концу оставшегося
+    tour = fragments.pop(0)
+    while fragments:
+        starts = coords[[fragment[0] for fragment in fragments]]
+        ends = coords[[fragment[-1] for fragment in fragments]]
+        last = coords[tour[-1]]
+        to_starts = np.hypot(*(starts - last).T)
+        to_ends = np.hypot(*(ends - last).T)
+        index = int(np.argmin(np.minimum(to_starts, to_ends)))
+        fragment = fragments.pop(index)
+        tour.extend(fragment if to_starts[index] <= to_ends[index] else reversed(fragment))
+
+    return tour
+
+
+def space_filling_curve_tour(node_list: list, order: int = 16) -> List[int]:
+    """Строит маршрут обходом городов в порядке кривой Гильберта за O(n log n)
+
+    Args:
+        node_list (List[List[float]]): список координат узлов (городов)
+        order (int): порядок кривой (сетка 2^order x 2^order). По умолчанию 16
+
+    Returns:
+        Перестановка городов
+    """
+    coords = np.asarray(node_list, dtype=np.float64)
+    if len(coords) == 0:
+        return []
+    side = 1 << order
+    low = coords.min(axis=0)
+    extent = max(float((coords.max(axis=0) - low).max()), 1e-9)
+    x, y = np.minimum(((coords - low) / extent * side).astype(np.int64), side - 1).T
+
+    # Вычисление номера точки на кривой Гильберта (векторизованный вариант алгоритма xy2d)
+    index = np.zeros(len(coords), dtype=np.int64)
+    s = side >> 1
+    while s > 0:
+        rx = (x & s) > 0
+        ry = (y & s) > 0
+        index += s * s * ((3 * rx) ^ ry)
+        # Поворот квадранта
+        flip = ~ry & rx
+        x = np.where(flip, side - 1 - x, x)
+        y = np.where(flip, side - 1 - y, y)
+        x, y = np.where(~ry, y, x), np.where(~ry, x, y)
+        s >>= 1
+
+    return np.argsort(index, kind="stable").tolist()
+
+
+# Методы построения изначального маршрута по координатам городов
+CONSTRUCTORS = {
+    "nearest_neighbor": nearest_neighbor_tour,
+    "greedy": greedy_edge_tour,
+    "space_filling_curve": space_filling_curve_tour,
+}
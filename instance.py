@@ -1,87 +1,438 @@
+import hashlib
+import json
 import math
+import os
 import re
+from collections import OrderedDict
+from typing import Optional
+
+import numpy as np
+
+# Максимальная размерность задачи, для которой в режиме "auto" строится полная матрица расстояний
+MAX_MATRIX_DIMENSION = 5000
+# Папка, в которой по умолчанию хранится кэш разобранных задач и матриц расстояний
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "cache")
+# Файл с длинами оптимальных (лучших известных) решений задач
+OPTIMAL_SOLUTIONS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "optimalSolutions.txt")
+# Версия формата кэша (входит в ключ, поэтому при ее изменении старый кэш не используется и удаляется)
+CACHE_VERSION = 2
+# Размер блока (в байтах), которыми файл задачи читается при вычислении ключа кэша
+HASH_CHUNK_SIZE = 1 << 20
+# Имена файлов кэша: необязательная версия (v<версия>_), хэш содержимого файла задачи и суффикс
+CACHE_FILE_PATTERN = re.compile(r"^(?:v(\d+)_)?[0-9a-f]{64}(?:\.json|_coords\.npy|_d\.npy)$")
+# Количество весов в EDGE_WEIGHT_SECTION для каждого формата явной матрицы (n - размерность задачи)
+WEIGHT_COUNTS = {
+    "FULL_MATRIX": lambda n: n * n,
+    "UPPER_ROW": lambda n: n * (n - 1) // 2,
+    "LOWER_ROW": lambda n: n * (n - 1) // 2,
+    "UPPER_COL": lambda n: n * (n - 1) // 2,
+    "LOWER_COL": lambda n: n * (n - 1) // 2,
+    "UPPER_DIAG_ROW": lambda n: n * (n + 1) // 2,
+    "LOWER_DIAG_ROW": lambda n: n * (n + 1) // 2,
+    "UPPER_DIAG_COL": lambda n: n * (n + 1) // 2,
+    "LOWER_DIAG_COL": lambda n: n * (n + 1) // 2,
+}
+
+
+def euc_2d(node: np.ndarray, nodes: np.ndarray) -> np.ndarray:
+    """Евклидово расстояние, округленное до ближайшего целого (EUC_2D)"""
+    diff = nodes - node
+    return np.floor(np.sqrt(diff[:, 0] ** 2 + diff[:, 1] ** 2) + 0.5)
+
+
+def ceil_2d(node: np.ndarray, nodes: np.ndarray) -> np.ndarray:
+    """Евклидово расстояние, округленное вверх (CEIL_2D)"""
+    diff = nodes - node
+    return np.ceil(np.sqrt(diff[:, 0] ** 2 + diff[:, 1] ** 2))
+
+
+def att(node: np.ndarray, nodes: np.ndarray) -> np.ndarray:
+    """Псевдоевклидово расстояние (ATT)"""
+    diff = nodes - node
+    r = np.sqrt((diff[:, 0] ** 2 + diff[:, 1] ** 2) / 10.0)
+    t = np.floor(r + 0.5)
+    return np.where(t < r, t + 1, t)
+
+
+def geo_radians(coords: np.ndarray) -> np.ndarray:
+    """Переводит географические координаты в формате DDD.MM в радианы (как в TSPLIB)"""
+    degrees = np.trunc(coords)
+    return 3.141592 * (degrees + 5.0 * (coords - degrees) / 3.0) / 180.0
+
+
+def geo(node: np.ndarray, nodes: np.ndarray) -> np.ndarray:
+    """Географическое расстояние (GEO), координаты заданы в формате DDD.MM"""
+    lat_i, lon_i = geo_radians(node)
+    lat, lon = geo_radians(nodes[:, 0]), geo_radians(nodes[:, 1])
+    q1 = np.cos(lon_i - lon)
+    q2 = np.cos(lat_i - lat)
+    q3 = np.cos(lat_i + lat)
+    return np.trunc(6378.388 * np.arccos(np.clip(0.5 * ((1.0 + q1) * q2 - (1.0 - q1) * q3), -1.0, 1.0)) + 1.0)
+
+
+# Функции вычисления расстояний для поддерживаемых значений EDGE_WEIGHT_TYPE
+DISTANCE_FUNCTIONS = {
+    "EUC_2D": euc_2d,
+    "CEIL_2D": ceil_2d,
+    "ATT": att,
+    "GEO": geo,
+}
+
+
+def euc_2d_pair(x1: float, y1: float, x2: float, y2: float) -> int:
+    """Расстояние EUC_2D между двумя городами (аналог euc_2d для одной пары)"""
+    dx, dy = x2 - x1, y2 - y1
+    return math.floor(math.sqrt(dx * dx + dy * dy) + 0.5)
+
+
+def ceil_2d_pair(x1: float, y1: float, x2: float, y2: float) -> int:
+    """Расстояние CEIL_2D между двумя городами (аналог ceil_2d для одной пары)"""
+    dx, dy = x2 - x1, y2 - y1
+    return math.ceil(math.sqrt(dx * dx + dy * dy))
+
+
+def att_pair(x1: float, y1: float, x2: float, y2: float) -> int:
+    """Расстояние ATT между двумя городами (аналог att для одной пары)"""
+    dx, dy = x2 - x1, y2 - y1
+    r = math.sqrt((dx * dx + dy * dy) / 10.0)
+    t = math.floor(r + 0.5)
+    return t + 1 if t < r else t
+
+
+def geo_pair(lat1: float, lon1: float, lat2: float, lon2: float) -> int:
+    """Расстояние GEO между двумя городами по координатам в радианах (см. geo_radians; аналог geo для одной пары)"""
+    q1 = math.cos(lon1 - lon2)
+    q2 = math.cos(lat1 - lat2)
+    q3 = math.cos(lat1 + lat2)
+    return math.trunc(6378.388 * math.acos(min(1.0, max(-1.0, 0.5 * ((1.0 + q1) * q2 - (1.0 - q1) * q3)))) + 1.0)
+
+
+# Функции вычисления расстояния между двумя городами для поддерживаемых значений EDGE_WEIGHT_TYPE
+PAIR_DISTANCE_FUNCTIONS = {
+    "EUC_2D": euc_2d_pair,
+    "CEIL_2D": ceil_2d_pair,
+    "ATT": att_pair,
+    "GEO": geo_pair,
+}
+
+
+def get_distances(node: np.ndarray, nodes: np.ndarray, edge_weight_type: str = "EUC_2D") -> np.ndarray:
+    """Вычисление расстояний от одного узла до набора узлов
+
+    Args:
+        node (numpy.ndarray): координаты узла
+        nodes (numpy.ndarray): массив координат узлов размера (k, 2)
+        edge_weight_type (str): тип расстояния по TSPLIB (EUC_2D | CEIL_2D | ATT | GEO). По умолчанию EUC_2D
+
+    Returns:
+        Массив из k целых расстояний (int32)
+    """
+    return DISTANCE_FUNCTIONS[edge_weight_type](node, nodes).astype(np.int32)
+
+
+def read_optimal_solutions(file_name: str = OPTIMAL_SOLUTIONS_FILE) -> dict:
+    """Читает длины оптимальных решений задач из файла со строками вида "имя : длина"
+
+    Если для задачи указано несколько длин (с типом расстояния в скобках), используется первая
+
+    Args:
+        file_name (str): название файла. По умолчанию OPTIMAL_SOLUTIONS_FILE
+
+    Returns:
+        Словарь {название задачи: длина оптимального решения}
+    """
+    optimums = {}
+    with open(file_name, "r") as file:
+        for string in file:
+            if string.strip():
+                name, answer = map(lambda s: s.strip(), string.split(":"))
+                optimums.setdefault(name, int(answer.split()[0]))
+
+    return optimums
 
 
 class TSP_INSTANCE:
     """Класс, создающий объект условий для задачи о коммивояжере.
 
-    Данный класс может обработать только задачи типа TSP (формат условия - TSP)
+    Данный класс может обработать задачи типа TSP с расстояниями типов EUC_2D, CEIL_2D, ATT, GEO или с явно
+    заданной матрицей расстояний (EXPLICIT), а также несимметричные задачи типа ATSP (с явно заданной матрицей)
 
     Attributes:
         file (TextIO): файл
         attributes (Dict[str, str]): атрибуты (параметры) файла
-        node_list (List[List[float]]): список координат узлов (городов)
-        d (List[List[float]]): матрица расстояний между городами
+        node_list (Optional[List[List[float]]]): список координат узлов (городов). Для задач с явно заданной
+            матрицей - координаты из DISPLAY_DATA_SECTION или None, если их нет
+        d (numpy.ndarray | DistanceOracle): матрица расстояний между городами (int32, C-contiguous) или
+            оракул, вычисляющий расстояния по требованию
     """
-    def __init__(self, file_name: str):
+    def __init__(
+            self,
+            file_name: str,
+            distance_mode: str = "auto",
+            cache_size: int = 1024,
+            cache_dir: Optional[str] = DEFAULT_CACHE_DIR
+    ):
         """Инициализация объекта с уловиями для задачи о коммивожере
 
         Args:
             file_name (str): название файла с условием задачи о коммивояжере
+            distance_mode (str): способ хранения расстояний (matrix | oracle | auto). В режиме auto матрица
+                строится, только если размерность задачи не превышает MAX_MATRIX_DIMENSION. По умолчанию auto
+            cache_size (int): количество строк, вычисленных целиком, хранимых оракулом расстояний (см.
+                DistanceOracle.row). По умолчанию 1024
+            cache_dir (Optional[str]): папка для кэша разобранных задач. Ключ кэша - версия формата кэша и хэш
+                содержимого файла, матрица расстояний при повторной загрузке отображается в память без
+                копирования. При записи в кэш файлы кэша других версий удаляются. None отключает кэш.
+                По умолчанию DEFAULT_CACHE_DIR
         """
+        if distance_mode not in ("auto", "matrix", "oracle"):
+            raise ValueError(f"Неизвестный способ хранения расстояний: {distance_mode}")
+
         self.file = open(file_name, "r")
-        self.attributes = self.__read_file_header()
-        self.node_list = self.__read_file()
-        self.d = self.__create_distance_matrix()
+        cache_path = None
+        if cache_dir is not None:
+            # Файл хэшируется блоками, чтобы большие задачи не загружались в память целиком
+            file_hash = hashlib.sha256()
+            with open(file_name, "rb") as binary_file:
+                for chunk in iter(lambda: binary_file.read(HASH_CHUNK_SIZE), b""):
+                    file_hash.update(chunk)
+            cache_path = os.path.join(cache_dir, f"v{CACHE_VERSION}_{file_hash.hexdigest()}")
+
+        if cache_path is None or not self.__load_cache(cache_path, distance_mode):
+            self.attributes = self.__read_file_header()
+            self.node_list = self.__read_file()
+            if self.__resolve_distance_mode(distance_mode) == "matrix":
+                self.d = self.__create_distance_matrix()
+            else:
+                self.d = None
+            if cache_path is not None:
+                self.__save_cache(cache_path)
+        if self.d is None:
+            self.d = DistanceOracle(self.node_list, cache_size, self.attributes.get("EDGE_WEIGHT_TYPE", "EUC_2D"))
 
         # Закрытие файла
         self.file.close()
 
+    def __load_cache(self, cache_path: str, distance_mode: str) -> bool:
+        """Загружает атрибуты, координаты и матрицу расстояний из кэша
+
+        Матрица расстояний отображается в память (только для чтения), поэтому несколько процессов,
+        загрузивших одну и ту же задачу, используют одни и те же страницы памяти
+
+        Args:
+            cache_path (str): путь к файлам кэша без расширения
+            distance_mode (str): способ хранения расстояний (matrix | oracle | auto)
+
+        Returns:
+            True, если задача загружена из кэша, иначе False
+        """
+        try:
+            with open(cache_path + ".json", "r") as header:
+                self.attributes = json.load(header)
+            coords = np.load(cache_path + "_coords.npy")
+            self.node_list = coords.tolist() if coords.size else None
+            self.d = None
+            if self.__resolve_distance_mode(distance_mode) == "matrix":
+                self.d = np.load(cache_path + "_d.npy", mmap_mode="r")
+        except (OSError, ValueError):
+            return False
+
+        return True
+
+    def __save_cache(self, cache_path: str):
+        """Сохраняет атрибуты, координаты и (если она построена) матрицу расстояний в кэш
+
+        Файлы записываются во временные файлы и затем атомарно переименовываются, чтобы параллельно
+        запущенные процессы никогда не прочитали записанный не до конца кэш
+
+        Args:
+            cache_path (str): путь к файлам кэша без расширения
+        """
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            tmp_suffix = f".{os.getpid()}.tmp"
+            coords = np.asarray(self.node_list if self.node_list is not None else np.empty((0, 2)), dtype=np.float64)
+            files = [(cache_path + "_coords.npy", coords)]
+            if self.d is not None:
+                files.append((cache_path + "_d.npy", self.d))
+            for path, array in files:
+                with open(path + tmp_suffix, "wb") as cache_file:
+                    np.save(cache_file, array)
+                os.replace(path + tmp_suffix, path)
+            # Заголовок записывается последним: его наличие означает, что остальные файлы уже записаны
+            with open(cache_path + ".json" + tmp_suffix, "w") as header:
+                json.dump(self.attributes, header)
+            os.replace(cache_path + ".json" + tmp_suffix, cache_path + ".json")
+
+            # Удаление файлов кэша других версий (остальные файлы в папке не затрагиваются)
+            cache_dir = os.path.dirname(cache_path)
+            for name in os.listdir(cache_dir):
+                match = CACHE_FILE_PATTERN.match(name)
+                if match and match.group(1) != str(CACHE_VERSION):
+                    os.remove(os.path.join(cache_dir, name))
+        except OSError:
+            pass  # кэш - только оптимизация, задача уже загружена
+
+    def __resolve_distance_mode(self, distance_mode: str) -> str:
+        """Определяет способ хранения расстояний (matrix | oracle) для режима auto
+
+        Raises:
+            ValueError: оракул запрошен для задачи с явно заданной матрицей расстояний
+        """
+        explicit = self.attributes.get("EDGE_WEIGHT_TYPE") == "EXPLICIT"
+        if distance_mode == "auto":
+            dimension = int(self.attributes["DIMENSION"])
+            return "matrix" if explicit or dimension <= MAX_MATRIX_DIMENSION else "oracle"
+        if distance_mode == "oracle" and explicit:
+            raise ValueError("Для задачи с явно заданной матрицей расстояний нельзя использовать оракул")
+        return distance_mode
+
     def __read_file_header(self) -> dict:
         """Читает файл и выделяет из него атрибуты (параметры)
 
+        Название первой секции данных сохраняется для __read_file
+
         Returns:
             атрибуты файла
         """
         attributes = {}
         string = self.file.readline().strip()
         while not re.match(".*SECTION", string):
-            key, value = map(lambda s: s.strip(), string.split(": "))
-            attributes[key] = value
-            string = self.file.readline().strip()
+            if string:
+                key, value = map(lambda s: s.strip(), string.split(":", 1))
+                attributes[key] = value
+            string = self.file.readline()
+            if not string:
+                raise AttributeError("В файле нет секции с данными!")
+            string = string.strip()
+        self.__section = string
 
         return attributes
 
-    def __read_file(self) -> list:
-        """Читает файл и выделяет из него информацию о городах
+    def __read_file(self) -> Optional[list]:
+        """Читает секции с данными потоково, без загрузки всего файла в память
+
+        Координаты из NODE_COORD_SECTION (или DISPLAY_DATA_SECTION) и веса из EDGE_WEIGHT_SECTION читаются
+        построчно сразу в numpy-массивы. Веса хранятся только до построения матрицы расстояний
 
         Returns:
-            Список координат городов
+            Список координат городов (None, если координаты в файле не заданы)
 
         Raises:
             AttributeError: ошибка из-за подачи файла типа, который не может быть обработан
         """
-        if self.attributes["TYPE"] == "TSP":
-            node_list = []
-            for node in self.file.readlines():
-                if node.strip() == "EOF":
-                    break
-                x, y = node.split()[1:]
-                node_list.append([float(x), float(y)])
-
-            return node_list
-        else:
+        edge_weight_type = self.attributes.get("EDGE_WEIGHT_TYPE", "EUC_2D")
+        if self.attributes["TYPE"] not in ("TSP", "ATSP"):
             raise AttributeError("Алгоритм не может обработать данный тип файла!")
+        if edge_weight_type != "EXPLICIT" and edge_weight_type not in DISTANCE_FUNCTIONS:
+            raise AttributeError(f"Алгоритм не может обработать расстояния типа {edge_weight_type}!")
 
-    def __create_distance_matrix(self) -> list:
-        """Вычисляет матрицу расстояний между городами"""
         n = int(self.attributes["DIMENSION"])
-        distance_matrix = [[0] * n for _ in range(n)]
+        coords, self.__weights = None, None
+        section = self.__section
+        while section and section != "EOF":
+            if section in ("NODE_COORD_SECTION", "DISPLAY_DATA_SECTION"):
+                # Каждая строка содержит номер узла и 2 координаты
+                coords = self.__read_numbers(3 * n, np.float64).reshape(n, 3)[:, 1:]
+            elif section == "EDGE_WEIGHT_SECTION":
+                edge_weight_format = self.attributes.get("EDGE_WEIGHT_FORMAT", "FULL_MATRIX")
+                if edge_weight_format not in WEIGHT_COUNTS:
+                    raise AttributeError(f"Алгоритм не может обработать матрицу формата {edge_weight_format}!")
+                self.__weights = self.__read_numbers(WEIGHT_COUNTS[edge_weight_format](n), np.int32)
+            else:
+                raise AttributeError(f"Алгоритм не может обработать секцию {section}!")
 
-        for i in range(n):
-            for j in range(n):
-                if i == j:
-                    continue  # расстояние от узла до самого себя всегда 0
-                distance_matrix[i][j] = round(
-                    self.__get_distance(self.node_list[i], self.node_list[j])
-                )
+            section = self.file.readline()
+            while section and not section.strip():
+                section = self.file.readline()
+            section = section.strip()
+
+        if edge_weight_type == "EXPLICIT" and self.__weights is None:
+            raise AttributeError("В файле нет секции EDGE_WEIGHT_SECTION!")
+        if edge_weight_type != "EXPLICIT" and coords is None:
+            raise AttributeError("В файле нет секции NODE_COORD_SECTION!")
+
+        return coords.tolist() if coords is not None else None
+
+    def __read_numbers(self, count: int, dtype) -> np.ndarray:
+        """Читает из файла count чисел, разделенных пробельными символами, сразу в numpy-массив
+
+        Args:
+            count (int): количество чисел
+            dtype: тип элементов массива
+
+        Returns:
+            Массив из count чисел
+
+        Raises:
+            AttributeError: в секции меньше или больше чисел, чем ожидалось
+        """
+        numbers = np.empty(count, dtype=dtype)
+        filled = 0
+        while filled < count:
+            line = self.file.readline()
+            if not line or line.strip() == "EOF":
+                raise AttributeError("Секция с данными содержит меньше значений, чем ожидалось!")
+            values = np.fromstring(line, dtype=dtype, sep=" ")
+            if filled + len(values) > count:
+                raise AttributeError("Секция с данными содержит больше значений, чем ожидалось!")
+            numbers[filled:filled + len(values)] = values
+            filled += len(values)
+
+        return numbers
+
+    def __create_distance_matrix(self) -> np.ndarray:
+        """Вычисляет матрицу расстояний между городами
+
+        Для задач с координатами расстояния вычисляются построчно и векторизованно только для верхнего
+        треугольника матрицы, нижний треугольник заполняется симметрично. Для задач с явно заданной
+        матрицей веса FULL_MATRIX уже прочитаны в массив из n * n чисел, который и становится матрицей, а веса
+        остальных форматов раскладываются в матрицу в соответствии с EDGE_WEIGHT_FORMAT. После построения
+        матрицы веса удаляются, чтобы задача не хранила расстояния дважды
+        """
+        n = int(self.attributes["DIMENSION"])
+        weights = self.__weights
+        del self.__weights
+
+        edge_weight_type = self.attributes.get("EDGE_WEIGHT_TYPE", "EUC_2D")
+        if edge_weight_type == "EXPLICIT":
+            if self.attributes.get("EDGE_WEIGHT_FORMAT", "FULL_MATRIX") == "FULL_MATRIX":
+                return weights.reshape(n, n)
+            distance_matrix = np.zeros((n, n), dtype=np.int32)
+            self.__fill_from_weights(distance_matrix, weights)
+            return distance_matrix
+
+        distance_matrix = np.zeros((n, n), dtype=np.int32)
+        coords = np.asarray(self.node_list, dtype=np.float64)
+        for i in range(n - 1):
+            distance_matrix[i, i + 1:] = get_distances(coords[i], coords[i + 1:], edge_weight_type)
+            distance_matrix[i + 1:, i] = distance_matrix[i, i + 1:]
 
         return distance_matrix
 
-    @staticmethod
-    def __get_distance(node1: list, node2: list) -> float:
-        """Вычисление расстояния от одного узла до другого"""
-        return math.sqrt((node1[0] - node2[0]) ** 2 + (node1[1] - node2[1]) ** 2)
+    def __fill_from_weights(self, distance_matrix: np.ndarray, weights: np.ndarray):
+        """Заполняет матрицу расстояний весами треугольного формата из EDGE_WEIGHT_SECTION
+
+        Треугольник, записанный по столбцам, совпадает с противоположным треугольником, записанным по строкам,
+        поэтому форматы *_COL сводятся к форматам *_ROW
+
+        Args:
+            distance_matrix (numpy.ndarray): матрица расстояний размера (n, n)
+            weights (numpy.ndarray): веса в порядке следования в файле
+        """
+        n = len(distance_matrix)
+        edge_weight_format = self.attributes["EDGE_WEIGHT_FORMAT"]
+        upper = edge_weight_format in ("UPPER_ROW", "LOWER_COL", "UPPER_DIAG_ROW", "LOWER_DIAG_COL")
+        diagonal = "DIAG" in edge_weight_format
+        offset = 0
+        for i in range(n):
+            if upper:
+                start, stop = (i if diagonal else i + 1), n
+            else:
+                start, stop = 0, (i + 1 if diagonal else i)
+            distance_matrix[i, start:stop] = weights[offset:offset + stop - start]
+            distance_matrix[start:stop, i] = distance_matrix[i, start:stop]
+            offset += stop - start
 
     def __str__(self):
         string = ""
@@ -91,6 +442,90 @@ class TSP_INSTANCE:
         return string
 
 
+class _OracleRow:
+    """Строка оракула расстояний: d[i][j] вычисляется по координатам городов i и j за O(1) без вычисления строки"""
+    __slots__ = ("__distance", "__a", "__b", "__first", "__second")
+
+    def __init__(self, distance, first: list, second: list, i: int):
+        self.__distance = distance
+        self.__first, self.__second = first, second  # первые и вторые координаты всех городов
+        self.__a, self.__b = first[i], second[i]
+
+    def __getitem__(self, j: int) -> int:
+        return self.__distance(self.__a, self.__b, self.__first[j], self.__second[j])
+
+    def __len__(self):
+        return len(self.__first)
+
+
+class DistanceOracle:
+    """Класс, вычисляющий расстояния между городами по требованию вместо хранения полной матрицы.
+
+    Поддерживает тот же доступ d[i][j] и len(d), что и матрица расстояний, поэтому может передаваться в
+    TSPSolver и функции модуля tools вместо нее. d[i] - легкая строка, которая вычисляет только запрошенное
+    расстояние d[i][j] за O(1), поэтому вычисление длины маршрута и оценка ходов не вычисляют строки целиком.
+    Для просмотра строки целиком row(i) векторизованно вычисляет ее и хранит в кэше; при переполнении кэша
+    вытесняется строка, к которой дольше всего не обращались. Память O(n * cache_size) вместо O(n^2)
+
+    Attributes:
+        coords (numpy.ndarray): координаты городов размера (n, 2)
+        cache_size (int): максимальное количество строк в кэше row
+        edge_weight_type (str): тип расстояния по TSPLIB (EUC_2D | CEIL_2D | ATT | GEO)
+    """
+    def __init__(self, node_list: list, cache_size: int = 1024, edge_weight_type: str = "EUC_2D"):
+        """Инициализация оракула расстояний
+
+        Args:
+            node_list (List[List[float]]): список координат узлов (городов)
+            cache_size (int): максимальное количество строк в кэше row. По умолчанию 1024
+            edge_weight_type (str): тип расстояния по TSPLIB (EUC_2D | CEIL_2D | ATT | GEO). По умолчанию EUC_2D
+        """
+        self.coords = np.asarray(node_list, dtype=np.float64)
+        self.cache_size = max(1, cache_size)
+        self.edge_weight_type = edge_weight_type
+        self.__rows = OrderedDict()
+        self.__build_pair_rows()
+
+    def __build_pair_rows(self):
+        """Строит строки d[i], вычисляющие отдельные расстояния (координаты хранятся в списках Python, потому что
+        индексирование numpy-массива из интерпретатора медленное)"""
+        points = geo_radians(self.coords) if self.edge_weight_type == "GEO" else self.coords
+        first, second = points[:, 0].tolist(), points[:, 1].tolist()
+        distance = PAIR_DISTANCE_FUNCTIONS[self.edge_weight_type]
+        self.__pair_rows = [_OracleRow(distance, first, second, i) for i in range(len(self.coords))]
+
+    def __len__(self):
+        return len(self.coords)
+
+    def __getitem__(self, i: int) -> _OracleRow:
+        """Возвращает строку расстояний от города i, вычисляющую отдельные расстояния d[i][j] за O(1)"""
+        return self.__pair_rows[i]
+
+    def row(self, i: int) -> memoryview:
+        """Возвращает вычисленную целиком строку расстояний от города i до всех городов (с кэшированием)"""
+        row = self.__rows.get(i)
+        if row is not None:
+            self.__rows.move_to_end(i)
+            return row
+
+        row = memoryview(get_distances(self.coords[i], self.coords, self.edge_weight_type))
+        self.__rows[i] = row
+        if len(self.__rows) > self.cache_size:
+            self.__rows.popitem(last=False)
+        return row
+
+    def __getstate__(self):
+        # Кэш не передается при сериализации (memoryview не сериализуется, а строки легко вычислить заново)
+        return {"coords": self.coords, "cache_size": self.cache_size, "edge_weight_type": self.edge_weight_type}
+
+    def __setstate__(self, state):
+        self.coords = state["coords"]
+        self.cache_size = state["cache_size"]
+        self.edge_weight_type = state["edge_weight_type"]
+        self.__rows = OrderedDict()
+        self.__build_pair_rows()
+
+
 if __name__ == "__main__":
     problem1 = TSP_INSTANCE("data/benchmarks/u724.tsp")
     print(problem1.d, problem1.attributes, problem1.node_list, sep="\n")
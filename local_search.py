@@ -0,0 +1,162 @@
+import collections
+from typing import List, Optional, Tuple
+
+import tools
+
+
+def polish(x: List[int], d, neighbors: List[List[int]], max_segment: int = 3) -> int:
+    """Улучшает маршрут локальным поиском 2-opt и Or-opt до локального минимума
+
+    Для каждого города рассматриваются только ходы, делающие соседним с ним один из городов его списка соседей.
+    Используются биты "не смотреть" (don't-look bits): город проверяется повторно, только если изменилось одно
+    из ребер рядом с ним, поэтому после первого прохода проверяется лишь окрестность выполненных ходов.
+
+    Args:
+        x (List[int]): перестановка, изменяется на месте
+        d (List[List[float]] | numpy.ndarray | instance.DistanceOracle): матрица расстояний (строки вида d[i][j])
+        neighbors (List[List[int]]): списки ближайших соседей каждого города, упорядоченные по возрастанию
+            расстояния (см. модуль candidates)
+        max_segment (int): максимальная длина участка, переносимого ходом Or-opt. По умолчанию 3
+
+    Returns:
+        Изменение длины маршрута (не больше 0)
+    """
+    n = len(x)
+    if n < 5:
+        return 0
+    pos = [0] * n
+    for k, city in enumerate(x):
+        pos[city] = k
+
+    active = collections.deque(x)  # города со снятым битом "не смотреть"
+    queued = [True] * n
+    total = 0
+    while active:
+        a = active.popleft()
+        queued[a] = False
+        move = _two_opt(x, pos, d, neighbors, a) or _or_opt(x, pos, d, neighbors, a, max_segment)
+        if move is None:
+            continue
+        delta, cities = move
+        total += delta
+        for city in cities:
+            if not queued[city]:
+                queued[city] = True
+                active.append(city)
+
+    return total
+
+
+def _reverse(x: List[int], pos: List[int], i: int, j: int):
+    """Разворачивает участок с позиции i по позицию j (i < j); если он длиннее половины маршрута, вместо него
+    разворачивается оставшаяся часть цикла (получается тот же цикл)"""
+    n = len(x)
+    if 2 * (j - i + 1) <= n:
+        x[i:j + 1] = x[i:j + 1][::-1]
+        for k in range(i, j + 1):
+            pos[x[k]] = k
+        return
+    k, m = j + 1, i - 1 + n
+    while k < m:
+        p, q = k % n, m % n
+        x[p], x[q] = x[q], x[p]
+        pos[x[p]], pos[x[q]] = p, q
+        k += 1
+        m -= 1
+
+
+def _two_opt(x: List[int], pos: List[int], d, neighbors: List[List[int]], a: int) -> Optional[Tuple[int, tuple]]:
+    """Ищет и выполняет улучшающий ход 2-opt, делающий город a соседним с одним из его соседей
+
+    Returns:
+        None, если ход не найден, иначе кортеж из изменения длины маршрута и концов измененных ребер
+    """
+    n = len(x)
+    p = pos[a]
+    for direction in (1, -1):
+        d_ab = d[a][x[(p + direction) % n]]
+        for c in neighbors[a]:
+            # Новое ребро (a, c) должно быть короче удаляемого ребра рядом с a
+            if d[a][c] >= d_ab:
+                break
+            q = pos[c]
+            if direction == 1:
+                # Ребра (a, следующий за a) и (c, следующий за c) заменяются на (a, c) и ребро между следующими
+                i, j = (p + 1, q) if p < q else (q + 1, p)
+            else:
+                # Ребра (предыдущий a, a) и (предыдущий c, c) заменяются на (a, c) и ребро между предыдущими
+                i, j = (q, p - 1) if q < p else (p, q - 1)
+            if i >= j:
+                continue
+            delta = tools.delta_inverse(x, i, j, d)
+            if delta < 0:
+                cities = (x[i - 1], x[i], x[j], x[(j + 1) % n])
+                _reverse(x, pos, i, j)
+                return delta, cities
+
+    return None
+
+
+def _or_opt(
+        x: List[int],
+        pos: List[int],
+        d,
+        neighbors: List[List[int]],
+        a: int,
+        max_segment: int
+) -> Optional[Tuple[int, tuple]]:
+    """Ищет и выполняет улучшающий ход Or-opt: участок длиной до max_segment городов, начинающийся или
+    заканчивающийся городом a, переносится (возможно, с разворотом) так, чтобы a стал соседним с одним из своих
+    соседей
+
+    Returns:
+        None, если ход не найден, иначе кортеж из изменения длины маршрута и концов измененных ребер
+    """
+    n = len(x)
+    p = pos[a]
+    for length in range(1, min(max_segment, n - 3) + 1):
+        for s, e in ((p, p + length - 1), (p - length + 1, p)):
+            # Участки, проходящие через конец списка, не рассматриваются
+            if s < 0 or e >= n:
+                continue
+            prev, nxt = x[s - 1], x[(e + 1) % n]
+            far = x[e] if s == p else x[s]  # другой конец участка
+            # Уменьшение длины маршрута при удалении участка
+            gain = d[prev][x[s]] + d[x[e]][nxt] - d[prev][nxt]
+            if gain <= 0:
+                continue
+            for c in neighbors[a]:
+                if d[a][c] >= gain:
+                    break
+                q = pos[c]
+                if s <= q <= e:
+                    continue
+                for c2 in (x[(q + 1) % n], x[q - 1]):
+                    if s <= pos[c2] <= e:
+                        continue
+                    # Участок вставляется между c и c2: появляются ребра (c, a) и (far, c2)
+                    delta = d[c][a] + d[far][c2] - d[c][c2] - gain
+                    if delta < 0:
+                        _move_segment(x, pos, s, e, a, c, c2)
+                        return delta, (prev, nxt, a, far, c, c2)
+
+    return None
+
+
+def _move_segment(x: List[int], pos: List[int], s: int, e: int, a: int, c: int, c2: int):
+    """Переносит участок с позиции s по позицию e между соседними городами c и c2 так, чтобы a стал соседним с c"""
+    segment = x[s:e + 1]
+    if segment[0] != a:
+        segment.reverse()  # участок начинается с a
+    del x[s:e + 1]
+    length = len(segment)
+    index_c = pos[c] if pos[c] < s else pos[c] - length
+    index_c2 = pos[c2] if pos[c2] < s else pos[c2] - length
+    if index_c2 == (index_c + 1) % len(x):
+        index = index_c + 1  # ... c, a, ..., far, c2 ...
+    else:
+        index = index_c  # ... c2, far, ..., a, c ...
+        segment.reverse()
+    x[index:index] = segment
+    for k in range(min(s, index), max(e, index + length - 1) + 1):
+        pos[x[k]] = k
@@ -0,0 +1,94 @@
+import json
+import time
+from typing import Callable, Optional
+
+
+class SolverMetrics:
+    """Метрики работы солвера TSPSolver.
+
+    Объект передается в солвер (параметр metrics) и заполняется по ходу решения. Счетчики ходов обновляются
+    один раз за итерацию внешнего цикла, а внутри внутреннего цикла учитываются только принятые ходы, поэтому
+    сбор метрик почти не замедляет решение. Если объект не передан, солвер не выполняет никаких измерений.
+
+    Typical usage example:
+        metrics = SolverMetrics(callback=lambda outer_cntr, m: print(outer_cntr, m.accepted_improving))
+        TSPSolver(temp_len, p0, outer_limit, d, metrics=metrics).run()
+        metrics.save("metrics.json")
+
+    Attributes:
+        moves_evaluated (int): количество оцененных соседних решений
+        accepted_improving (int): количество принятых неухудшающих ходов
+        accepted_worsening (int): количество принятых ухудшающих ходов
+        operator_wins (Dict[str, int]): количество принятых во внутреннем цикле ходов каждого оператора
+            (inverse | insert | swap); ходы при генерации списка температур не учитываются
+        phase_time (Dict[str, float]): время этапов решения в секундах (initialization, temperature_list,
+            outer_loop, polish - локальный поиск, включая его вызовы внутри внешнего цикла)
+        iteration_time (List[float]): время каждой итерации внешнего цикла в секундах
+        temperature_stats (List[dict]): статистика списка температур (len, min, max, mean) после каждой
+            temperature_stats_every-й итерации внешнего цикла
+        temperature_stats_every (int): период сбора статистики температур
+        callback (Optional[Callable[[int, SolverMetrics], None]]): функция, вызываемая после каждой итерации
+            внешнего цикла с номером итерации и метриками
+    """
+    def __init__(
+            self,
+            callback: Optional[Callable[[int, "SolverMetrics"], None]] = None,
+            temperature_stats_every: int = 1
+    ):
+        """Инициализация метрик
+
+        Args:
+            callback (Optional[Callable[[int, SolverMetrics], None]]): функция, вызываемая после каждой итерации
+                внешнего цикла. По умолчанию None
+            temperature_stats_every (int): период (в итерациях внешнего цикла) сбора статистики температур.
+                По умолчанию 1
+        """
+        self.moves_evaluated = 0
+        self.accepted_improving = 0
+        self.accepted_worsening = 0
+        self.operator_wins = {"inverse": 0, "insert": 0, "swap": 0}
+        self.phase_time = {"initialization": 0.0, "temperature_list": 0.0, "outer_loop": 0.0, "polish": 0.0}
+        self.iteration_time = []
+        self.temperature_stats = []
+        self.temperature_stats_every = temperature_stats_every
+        self.callback = callback
+
+    def count_win(self, apply: Callable, count: int = 1):
+        """Учитывает count принятых ходов оператора, заданного функцией применения (tools.apply_*)"""
+        name = apply.__name__[len("apply_"):]
+        self.operator_wins[name] = self.operator_wins.get(name, 0) + count
+
+    def start(self) -> float:
+        """Возвращает отметку времени для последующего вызова stop"""
+        return time.perf_counter()
+
+    def stop(self, phase: str, start: float) -> float:
+        """Добавляет время, прошедшее с отметки start, ко времени этапа phase
+
+        Returns:
+            Прошедшее время в секундах
+        """
+        elapsed = time.perf_counter() - start
+        self.phase_time[phase] = self.phase_time.get(phase, 0.0) + elapsed
+        return elapsed
+
+    def to_dict(self) -> dict:
+        """Возвращает метрики в виде словаря (без функции обратного вызова)"""
+        return {
+            "moves_evaluated": self.moves_evaluated,
+            "accepted_improving": self.accepted_improving,
+            "accepted_worsening": self.accepted_worsening,
+            "operator_wins": dict(self.operator_wins),
+            "phase_time": dict(self.phase_time),
+            "iteration_time": list(self.iteration_time),
+            "temperature_stats": list(self.temperature_stats),
+        }
+
+    def to_json(self) -> str:
+        """Возвращает метрики в формате JSON"""
+        return json.dumps(self.to_dict())
+
+    def save(self, file_name: str):
+        """Сохраняет метрики в JSON-файл"""
+        with open(file_name, "w") as file:
+            json.dump(self.to_dict(), file)
@@ -0,0 +1,300 @@
+import multiprocessing
+import os
+import queue
+import random
+import time
+from multiprocessing import shared_memory
+from typing import Optional
+
+import numpy as np
+
+import solver
+
+# Матрица расстояний, подключенная к разделяемой памяти в процессе-исполнителе
+_worker_matrix = None
+# Интервал (в секундах) проверки завершившихся островов при ожидании их результатов
+ISLAND_POLL_INTERVAL = 1.0
+
+
+class SharedMatrix:
+    """Матрица расстояний, расположенная в разделяемой памяти.
+
+    Процессы-исполнители подключаются к памяти по имени, поэтому матрица не сериализуется и не копируется
+    при передаче в каждый процесс: добавление исполнителей не увеличивает расход памяти.
+
+    Typical usage example:
+        with SharedMatrix(problem.d) as shared:
+            pool = multiprocessing.Pool(initializer=init_worker, initargs=(shared.descriptor,))
+
+    Attributes:
+        shm (shared_memory.SharedMemory): блок разделяемой памяти
+        matrix (numpy.ndarray): матрица расстояний, расположенная в блоке
+        descriptor (Tuple[str, Tuple[int, int], str]): имя блока, размер матрицы и тип элементов
+    """
+    def __init__(self, d):
+        """Копирует матрицу расстояний в новый блок разделяемой памяти
+
+        Args:
+            d (numpy.ndarray | List[List[float]]): матрица расстояний
+        """
+        d = np.asarray(d)
+        self.shm = shared_memory.SharedMemory(create=True, size=max(1, d.nbytes))
+        self.matrix = np.ndarray(d.shape, dtype=d.dtype, buffer=self.shm.buf)
+        self.matrix[:] = d
+        self.descriptor = (self.shm.name, d.shape, d.dtype.str)
+
+    @staticmethod
+    def attach(descriptor) -> tuple:
+        """Подключается к матрице, созданной в другом процессе
+
+        Args:
+            descriptor (Tuple[str, Tuple[int, int], str]): описание матрицы (SharedMatrix.descriptor)
+
+        Returns:
+            Кортеж из блока разделяемой памяти и матрицы, расположенной в нем
+        """
+        name, shape, dtype = descriptor
+        shm = shared_memory.SharedMemory(name=name)
+        return shm, np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+
+    def close(self):
+        """Освобождает блок разделяемой памяти"""
+        self.matrix = None
+        self.shm.close()
+        self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def init_worker(descriptor):
+    """Подключает процесс-исполнитель к матрице расстояний в разделяемой памяти
+
+    Args:
+        descriptor (Optional[Tuple[str, Tuple[int, int], str]]): описание матрицы (SharedMatrix.descriptor).
+            None, если матрица передается в задачах (например, оракул расстояний)
+    """
+    global _worker_matrix
+    if descriptor is not None:
+        _worker_matrix = SharedMatrix.attach(descriptor)
+
+
+def worker_matrix(d=None):
+    """Возвращает матрицу расстояний процесса-исполнителя
+
+    Args:
+        d: матрица расстояний, переданная в задаче. Если None, используется матрица из разделяемой памяти
+
+    Returns:
+        Матрица расстояний
+    """
+    return d if d is not None else _worker_matrix[1]
+
+
+def _solve(args) -> dict:
+    """Выполняет один независимый запуск солвера в процессе-исполнителе"""
+    temp_len, p0, outer_limit, seed, d = args
+    start = time.perf_counter()
+    tsp_solver = solver.TSPSolver(temp_len, p0, outer_limit, worker_matrix(d), seed=seed)
+    tour, length = tsp_solver.run()
+    return {
+        "seed": seed,
+        "length": length,
+        "final_length": tsp_solver.f_x,
+        "tour": tour,
+        "time": time.perf_counter() - start,
+    }
+
+
+def multi_start(
+        temp_len: int,
+        p0: float,
+        outer_limit: int,
+        d,
+        runs: int,
+        processes: Optional[int] = None,
+        seed: Optional[int] = None
+) -> dict:
+    """Выполняет несколько независимых запусков солвера с разными зернами на пуле процессов
+
+    Матрица расстояний (numpy.ndarray или список списков) размещается в разделяемой памяти, оракул расстояний
+    передается в задачах (он занимает O(n) памяти)
+
+    Args:
+        temp_len (int): длина списка температур
+        p0 (float): изначальная вероятность
+        outer_limit (int): количество итераций для внешнего цикла
+        d (numpy.ndarray | List[List[float]] | instance.DistanceOracle): матрица расстояний
+        runs (int): количество запусков
+        processes (Optional[int]): количество процессов. По умолчанию min(runs, os.cpu_count())
+        seed (Optional[int]): зерно, из которого получаются зерна запусков. По умолчанию случайное
+
+    Returns:
+        Словарь с ключами:
+            - best_tour (List[int]): лучший найденный маршрут;
+            - best_length (float): его длина;
+            - runs (List[dict]): статистика запусков (seed, length - длина лучшего решения, final_length - длина
+              решения в конце запуска, time), в порядке запуска
+    """
+    seeds = random.Random(seed).sample(range(2 ** 31), runs)
+    processes = processes or min(runs, os.cpu_count() or 1)
+
+    shared = SharedMatrix(d) if isinstance(d, (np.ndarray, list)) else None
+    try:
+        task_d = None if shared is not None else d
+        with multiprocessing.Pool(
+                processes, initializer=init_worker, initargs=(shared.descriptor if shared else None,)
+        ) as pool:
+            results = pool.map(_solve, [(temp_len, p0, outer_limit, s, task_d) for s in seeds])
+    finally:
+        if shared is not None:
+            shared.close()
+
+    best_run = min(results, key=lambda run: run["length"])
+    return {
+        "best_tour": best_run["tour"],
+        "best_length": best_run["length"],
+        "runs": [{key: value for key, value in run.items() if key != "tour"} for run in results],
+    }
+
+
+def _island(index, temp_len, p0, outer_limit, seed, descriptor, d, migration_interval, share_temperatures,
+            inbox, outbox, results):
+    """Выполняет солвер одного острова, обмениваясь лучшими решениями с соседями по кольцу
+
+    Если остров завершается ошибкой, вместо результата в очередь results отправляется ее описание (error)
+    """
+    try:
+        init_worker(descriptor)
+        start = time.perf_counter()
+        tsp_solver = solver.TSPSolver(temp_len, p0, outer_limit, worker_matrix(d), seed=seed)
+        adopted = 0
+        while tsp_solver.advance(migration_interval):
+            # Отправка своего лучшего решения следующему острову и получение лучшего решения от предыдущего
+            temperatures = tsp_solver.temperatures() if share_temperatures else None
+            outbox.put((tsp_solver.best, tsp_solver.best_tour(), temperatures))
+            f_y, y, temperatures = inbox.get()
+            # Остров, текущее решение которого хуже лучшего решения соседа, перенимает его
+            if f_y < tsp_solver.f_x:
+                tsp_solver.adopt(y, temperatures)
+                adopted += 1
+
+        results.put({
+            "island": index,
+            "seed": seed,
+            "length": tsp_solver.best,
+            "final_length": tsp_solver.f_x,
+            "adopted": adopted,
+            "tour": tsp_solver.best_tour(),
+            "time": time.perf_counter() - start,
+        })
+    except Exception as error:
+        results.put({"island": index, "error": f"{type(error).__name__}: {error}"})
+
+
+def island_model(
+        temp_len: int,
+        p0: float,
+        outer_limit: int,
+        d,
+        islands: int,
+        migration_interval: int = 100,
+        share_temperatures: bool = False,
+        seed: Optional[int] = None
+) -> dict:
+    """Выполняет кооперативный параллельный LBSA по островной модели
+
+    Каждый остров - отдельный солвер в своем процессе. Через каждые migration_interval итераций внешнего
+    цикла острова, расположенные по кольцу, передают свое лучшее решение следующему острову. Остров, у которого
+    текущее решение хуже полученного, перенимает его (и, если share_temperatures, список температур соседа)
+
+    Args:
+        temp_len (int): длина списка температур
+        p0 (float): изначальная вероятность
+        outer_limit (int): количество итераций для внешнего цикла каждого острова
+        d (numpy.ndarray | List[List[float]] | instance.DistanceOracle): матрица расстояний
+        islands (int): количество островов (процессов)
+        migration_interval (int): количество итераций внешнего цикла между обменами. По умолчанию 100
+        share_temperatures (bool): передавать ли вместе с решением список температур. По умолчанию False
+        seed (Optional[int]): зерно, из которого получаются зерна островов. По умолчанию случайное
+
+    Returns:
+        Словарь с ключами:
+            - best_tour (List[int]): лучший найденный маршрут;
+            - best_length (float): его длина;
+            - runs (List[dict]): статистика островов (island, seed, length, final_length, adopted, time)
+
+    Raises:
+        RuntimeError: если один из островов завершился ошибкой (остальные острова при этом останавливаются)
+    """
+    seeds = random.Random(seed).sample(range(2 ** 31), islands)
+
+    shared = SharedMatrix(d) if isinstance(d, (np.ndarray, list)) else None
+    processes = []
+    try:
+        descriptor, task_d = (shared.descriptor, None) if shared is not None else (None, d)
+        queues = [multiprocessing.Queue() for _ in range(islands)]
+        results = multiprocessing.Queue()
+        processes = [
+            multiprocessing.Process(
+                target=_island,
+                args=(
+                    index, temp_len, p0, outer_limit, seeds[index], descriptor, task_d, migration_interval,
+                    share_temperatures, queues[index], queues[(index + 1) % islands], results
+                ),
+                daemon=True
+            )
+            for index in range(islands)
+        ]
+        for process in processes:
+            process.start()
+        # Результаты забираются до join, чтобы процессы не заблокировались на записи в очередь
+        runs = _collect_island_results(processes, results)
+        for process in processes:
+            process.join()
+    finally:
+        # После ошибки острова его соседи ждут решения, которое уже не придет, поэтому они останавливаются
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        if shared is not None:
+            shared.close()
+
+    best_run = min(runs, key=lambda run: run["length"])
+    return {
+        "best_tour": best_run["tour"],
+        "best_length": best_run["length"],
+        "runs": [{key: value for key, value in run.items() if key != "tour"} for run in runs],
+    }
+
+
+def _collect_island_results(processes: list, results: multiprocessing.Queue) -> list:
+    """Ожидает результаты всех островов
+
+    Args:
+        processes (List[multiprocessing.Process]): процессы островов (в порядке номеров островов)
+        results (multiprocessing.Queue): очередь результатов островов
+
+    Returns:
+        Результаты островов, упорядоченные по номеру острова
+
+    Raises:
+        RuntimeError: если остров сообщил об ошибке или его процесс аварийно завершился, не отправив результат
+    """
+    runs = {}
+    while len(runs) < len(processes):
+        try:
+            run = results.get(timeout=ISLAND_POLL_INTERVAL)
+        except queue.Empty:
+            for index, process in enumerate(processes):
+                if index not in runs and process.exitcode not in (None, 0):
+                    raise RuntimeError(f"Остров {index} аварийно завершился с кодом {process.exitcode}")
+            continue
+        if "error" in run:
+            raise RuntimeError(f"Остров {run['island']} завершился ошибкой: {run['error']}")
+        runs[run["island"]] = run
+
+    return [runs[index] for index in range(len(processes))]
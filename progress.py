@@ -0,0 +1,151 @@
+import queue
+import time
+from typing import Optional
+
+import numpy as np
+
+
+def tour_edges(tour, n: int) -> np.ndarray:
+    """Возвращает отсортированный массив ключей ребер маршрута (ребро (a, b), a < b, кодируется как a * n + b)"""
+    cities = np.asarray(tour, dtype=np.int64)
+    following = np.roll(cities, -1)
+    return np.sort(np.minimum(cities, following) * n + np.maximum(cities, following))
+
+
+class ProgressSender:
+    """Отправитель кадров прогресса солвера (сторона солвера).
+
+    Кадр содержит только ребра маршрута, удаленные и добавленные с момента предыдущего отправленного кадра.
+    Кадры отправляются не чаще одного раза в min_interval секунд через multiprocessing.Queue(maxsize=1). Если
+    получатель еще не забрал предыдущий кадр, новый кадр не отправляется (солвер никогда не ждет получателя),
+    а его изменения войдут в следующий кадр, поэтому получатель не теряет ни одного изменения маршрута.
+
+    Typical usage example:
+        frames = multiprocessing.Queue(maxsize=1)
+        TSPSolver(temp_len, p0, outer_limit, d, progress=ProgressSender(frames)).run()
+
+    Attributes:
+        frames (multiprocessing.Queue): очередь кадров
+        min_interval (float): минимальный интервал между кадрами в секундах
+    """
+    # Максимальное время отправки последнего кадра в секундах
+    FINAL_FRAME_TIMEOUT = 5.0
+
+    def __init__(self, frames, min_interval: float = 0.1):
+        """Инициализация отправителя
+
+        Args:
+            frames (multiprocessing.Queue): очередь кадров (рекомендуется maxsize=1)
+            min_interval (float): минимальный интервал между кадрами в секундах. По умолчанию 0.1
+        """
+        self.frames = frames
+        self.min_interval = min_interval
+        self.__edges = np.empty(0, dtype=np.int64)  # ребра, известные получателю после последнего кадра
+        self.__previous_edges = self.__edges  # ребра, известные получателю до последнего кадра
+        self.__last_time = -float("inf")
+
+    def update(self, solver, force: bool = False):
+        """Отправляет кадр с текущим состоянием солвера, если прошло min_interval секунд с прошлого кадра
+
+        Args:
+            solver (TSPSolver): солвер
+            force (bool): отправить кадр независимо от интервала; если получатель еще не забрал прошлый кадр, он
+                заменяется новым (используется для последнего кадра). По умолчанию False
+        """
+        now = time.perf_counter()
+        if not force and (now - self.__last_time < self.min_interval or self.frames.full()):
+            return  # получатель еще не забрал прошлый кадр
+
+        n = len(solver.x)
+        edges = tour_edges(solver.get_tour(), n)
+        deadline = now + self.FINAL_FRAME_TIMEOUT
+        while True:
+            frame = {
+                "n": n,
+                "outer_cntr": solver.outer_cntr,
+                "f_x": solver.f_x,
+                "best": solver.best,
+                "removed": np.setdiff1d(self.__edges, edges, assume_unique=True),
+                "added": np.setdiff1d(edges, self.__edges, assume_unique=True),
+            }
+            try:
+                self.frames.put_nowait(frame)
+                break
+            except queue.Full:
+                if not force or time.perf_counter() > deadline:
+                    return
+            # Устаревший кадр забирается из очереди, и новый кадр строится относительно ребер, известных получателю
+            try:
+                self.frames.get_nowait()
+                self.__edges = self.__previous_edges
+            except queue.Empty:
+                time.sleep(0.01)
+        self.__previous_edges, self.__edges = self.__edges, edges
+        self.__last_time = now
+
+
+class ProgressReceiver:
+    """Получатель кадров прогресса солвера (сторона интерфейса).
+
+    Хранит текущее множество ребер маршрута и объединяет все накопившиеся кадры в одно изменение
+
+    Attributes:
+        frames (multiprocessing.Queue): очередь кадров
+        edges (Set[Tuple[int, int]]): текущие ребра маршрута
+    """
+    def __init__(self, frames):
+        """Инициализация получателя
+
+        Args:
+            frames (multiprocessing.Queue): очередь кадров
+        """
+        self.frames = frames
+        self.edges = set()
+
+    def poll(self, timeout: Optional[float] = None) -> Optional[dict]:
+        """Забирает все накопившиеся кадры и применяет их к множеству ребер
+
+        Args:
+            timeout (Optional[float]): время ожидания первого кадра в секундах. None - не ждать
+
+        Returns:
+            None, если новых кадров нет, иначе словарь с ключами outer_cntr, f_x, best (из последнего кадра),
+            removed и added (списки ребер (a, b), удаленных и добавленных с прошлого вызова poll)
+        """
+        try:
+            frames = [self.frames.get(timeout=timeout) if timeout is not None else self.frames.get_nowait()]
+        except queue.Empty:
+            return None
+        # Все накопившиеся кадры объединяются в одно изменение
+        try:
+            while True:
+                frames.append(self.frames.get_nowait())
+        except queue.Empty:
+            pass
+
+        removed, added = set(), set()
+        for frame in frames:
+            n = frame["n"]
+            for key in frame["removed"].tolist():
+                edge = divmod(key, n)
+                if edge in added:
+                    added.discard(edge)
+                else:
+                    removed.add(edge)
+            for key in frame["added"].tolist():
+                edge = divmod(key, n)
+                if edge in removed:
+                    removed.discard(edge)
+                else:
+                    added.add(edge)
+        self.edges -= removed
+        self.edges |= added
+
+        last = frames[-1]
+        return {
+            "outer_cntr": last["outer_cntr"],
+            "f_x": last["f_x"],
+            "best": last["best"],
+            "removed": list(removed),
+            "added": list(added),
+        }
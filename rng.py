@@ -0,0 +1,149 @@
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+
+class RandomStream:
+    """Генератор случайных чисел солвера с заранее сгенерированными блоками значений.
+
+    Пары индексов, равномерные и экспоненциальные случайные величины генерируются блоками по block_size значений
+    (numpy.random.Generator) и выдаются по одному из списков, поэтому во внутреннем цикле солвера не вызываются
+    функции модуля random. Каждый вид значений получает свой генератор, порожденный от зерна
+    (numpy.random.SeedSequence), поэтому потоки с разными зернами независимы, а решение полностью
+    воспроизводится по зерну. Состояние (get_state/set_state) сериализуется в JSON.
+
+    Typical usage example:
+        stream = RandomStream(seed=1)
+        i, j = stream.pair(n)
+        accept = delta < temperature * stream.exponential()
+
+    Attributes:
+        seed (Optional[int]): зерно
+        block_size (int): количество значений в одном блоке
+    """
+    def __init__(self, seed: Optional[int] = None, block_size: int = 4096):
+        """Инициализация генератора
+
+        Args:
+            seed (Optional[int]): зерно. По умолчанию None (случайное зерно из энтропии системы)
+            block_size (int): количество значений в одном блоке. По умолчанию 4096
+        """
+        self.seed = seed
+        self.block_size = block_size
+        # Генераторы пар индексов, равномерных и экспоненциальных величин и пакетов пар индексов
+        self.__pair_generator, self.__uniform_generator, self.__exponential_generator, self.__batch_generator = (
+            np.random.default_rng(child) for child in np.random.SeedSequence(seed).spawn(4)
+        )
+        # Для каждого блока хранится состояние генератора до его генерации, что позволяет восстановить блок
+        self.__n = 0
+        self.__pair_state, self.__pairs_i, self.__pairs_j, self.__pair_position = None, [], [], 0
+        self.__uniform_state, self.__uniforms, self.__uniform_position = None, [], 0
+        self.__exponential_state, self.__exponentials, self.__exponential_position = None, [], 0
+
+    def __fill_pairs(self, n: int):
+        self.__n = n
+        self.__pair_state = self.__pair_generator.bit_generator.state
+        i, j = self.__draw_pairs(self.__pair_generator, n, self.block_size)
+        self.__pairs_i, self.__pairs_j, self.__pair_position = i.tolist(), j.tolist(), 0
+
+    def __fill_uniforms(self):
+        self.__uniform_state = self.__uniform_generator.bit_generator.state
+        self.__uniforms = self.__uniform_generator.random(self.block_size).tolist()
+        self.__uniform_position = 0
+
+    def __fill_exponentials(self):
+        self.__exponential_state = self.__exponential_generator.bit_generator.state
+        self.__exponentials = self.__exponential_generator.standard_exponential(self.block_size).tolist()
+        self.__exponential_position = 0
+
+    @staticmethod
+    def __draw_pairs(generator: np.random.Generator, n: int, size: int) -> Tuple[np.ndarray, np.ndarray]:
+        i = generator.integers(0, n, size)
+        j = generator.integers(0, n - 1, size)
+        j += j >= i  # j != i
+        return np.minimum(i, j), np.maximum(i, j)
+
+    def pair(self, n: int) -> Tuple[int, int]:
+        """Возвращает равномерно выбранную пару различных индексов i < j из диапазона [0, n)"""
+        k = self.__pair_position
+        if k >= len(self.__pairs_i) or n != self.__n:
+            self.__fill_pairs(n)
+            k = 0
+        self.__pair_position = k + 1
+        return self.__pairs_i[k], self.__pairs_j[k]
+
+    def pairs(self, n: int, size: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Возвращает size равномерно выбранных пар различных индексов (i < j поэлементно) из диапазона [0, n)"""
+        return self.__draw_pairs(self.__batch_generator, n, size)
+
+    def random(self) -> float:
+        """Возвращает равномерную случайную величину из [0, 1)"""
+        k = self.__uniform_position
+        if k >= len(self.__uniforms):
+            self.__fill_uniforms()
+            k = 0
+        self.__uniform_position = k + 1
+        return self.__uniforms[k]
+
+    def randrange(self, n: int) -> int:
+        """Возвращает случайный индекс из диапазона [0, n)"""
+        return int(self.random() * n)
+
+    def choice(self, seq: list):
+        """Возвращает случайный элемент непустой последовательности"""
+        return seq[int(self.random() * len(seq))]
+
+    def exponential(self) -> float:
+        """Возвращает экспоненциальную случайную величину -log(r), где r равномерна на (0, 1]
+
+        Условие r < exp(-delta / t) равносильно delta < t * exponential(), поэтому принятие хода не требует
+        вычисления экспоненты
+        """
+        k = self.__exponential_position
+        if k >= len(self.__exponentials):
+            self.__fill_exponentials()
+            k = 0
+        self.__exponential_position = k + 1
+        return self.__exponentials[k]
+
+    def permutation(self, n: int) -> List[int]:
+        """Возвращает случайную перестановку чисел 0..n-1"""
+        return self.__batch_generator.permutation(n).tolist()
+
+    def get_state(self) -> dict:
+        """Возвращает состояние генератора (JSON-совместимый словарь)"""
+        return {
+            "n": self.__n,
+            "pair": [self.__pair_state, self.__pair_position, self.__pair_generator.bit_generator.state],
+            "uniform": [self.__uniform_state, self.__uniform_position, self.__uniform_generator.bit_generator.state],
+            "exponential": [
+                self.__exponential_state, self.__exponential_position, self.__exponential_generator.bit_generator.state
+            ],
+            "batch": self.__batch_generator.bit_generator.state,
+        }
+
+    def set_state(self, state: dict):
+        """Восстанавливает состояние генератора, полученное get_state"""
+        self.__pair_position = self.__restore(
+            self.__pair_generator, state["pair"], lambda: self.__fill_pairs(state["n"])
+        )
+        self.__uniform_position = self.__restore(self.__uniform_generator, state["uniform"], self.__fill_uniforms)
+        self.__exponential_position = self.__restore(
+            self.__exponential_generator, state["exponential"], self.__fill_exponentials
+        )
+        self.__batch_generator.bit_generator.state = state["batch"]
+
+    @staticmethod
+    def __restore(generator: np.random.Generator, saved: list, fill) -> int:
+        """Восстанавливает состояние генератора и заново генерирует его текущий блок
+
+        Returns:
+            Позиция в восстановленном блоке
+        """
+        block_state, position, current_state = saved
+        if block_state is None:  # блок еще не генерировался
+            generator.bit_generator.state = current_state
+            return 0
+        generator.bit_generator.state = block_state
+        fill()
+        return position
@@ -1,10 +1,22 @@
-import heapq
+import json
 import math
+import os
 import random
-from multiprocessing.connection import Connection
-from typing import List, Optional
+import threading
+import time
+from typing import List, Optional, Tuple, Union
 
+import numpy as np
+
+import candidates as candidate_lists
+import construction
+import local_search
 import tools
+import tour
+from bandit import OperatorBandit
+from metrics import SolverMetrics
+from progress import ProgressSender
+from rng import RandomStream
 
 
 class TSPSolver:
@@ -15,26 +27,66 @@ class TSPSolver:
 
     Typical usage example:
         solver = TSPSolver(number_of_temperatures, initial_p, outer_limit, distance_matrix)
-        answer = solver.run()
+        tour, length = solver.run()
 
     Attributes:
         d (List[List[float]]): матрица расстояний между городами
         outer_limit (int): количество итераций внешнего цикла
         inner_limit (int): количество итераций внутреннего цикла
-        input_pipe (Optional[Connection]): труба для передачи данных в другой процесс
-        x (List[int]): текущая перестановка (решение задачи)
+        progress (Optional[progress.ProgressSender]): канал передачи прогресса решения в другой процесс
+        x (List[int] | tour.Tour): текущая перестановка (решение задачи)
         f_x (float): значение целевой функции для перестановки x
-        temperature_list (List[tools.Temperature]): список температур
-        best (float): лучшее из встречавшихся решений
+        temperature_list (tools.TemperatureList): список температур
+        best (float): длина лучшего из встречавшихся решений
+        best_x (Optional[List[int]]): снимок лучшего решения, если текущее решение хуже него (см. best_tour)
         best_by_iterations (Dict[int, float]): словарь лучших решений по итерациям
+        outer_cntr (int): количество выполненных итераций внешнего цикла
+        stop_reason (Optional[str]): причина остановки последнего вызова run/iterate (outer_limit | time_limit |
+            target | stagnation)
+        tour_type (str): представление перестановки x (list | tour)
+        candidates (Optional[List[List[int]]]): списки кандидатов (ближайших соседей) для выбора ходов
+        uniform_share (float): доля ходов, выбираемых равномерно случайно при наличии списков кандидатов
+        batch_size (int): количество пар индексов, оцениваемых за один шаг
+        metrics (Optional[metrics.SolverMetrics]): метрики работы солвера (None - метрики не собираются)
+        checkpoint_file (Optional[str]): файл для периодического сохранения состояния солвера
+        checkpoint_every (int): количество итераций внешнего цикла между сохранениями состояния
+        polish (bool): улучшать ли решение локальным поиском (2-opt и Or-opt) по завершении run
+        polish_every (Optional[int]): количество итераций внешнего цикла между улучшениями решения локальным поиском
+        symmetric (bool): симметрична ли матрица расстояний (False - несимметричная задача, ATSP)
+        seed (int): зерно генератора случайных чисел солвера
+        construction_time (float): время построения изначального решения в секундах
+        operator_selection (str): выбор операторов для оценки соседних решений (all | adaptive)
+        operator_bandit (Optional[bandit.OperatorBandit]): статистика успешности операторов при
+            operator_selection=adaptive
     """
+    # Версия формата сохранения состояния (save_checkpoint)
+    CHECKPOINT_VERSION = 3
+    # Количество ближайших соседей в списках для локального поиска, если списки кандидатов не заданы
+    POLISH_NEIGHBORS = 8
+
     def __init__(
             self,
             temp_len: int,
             p0: float,
             outer_limit: int,
             d: List[List[float]],
-            input_pipe: Optional[Connection] = None
+            progress: Optional[ProgressSender] = None,
+            tour_type: str = "list",
+            candidates: Optional[List[List[int]]] = None,
+            uniform_share: float = 0.1,
+            batch_size: int = 1,
+            metrics: Optional[SolverMetrics] = None,
+            checkpoint_file: Optional[str] = None,
+            checkpoint_every: int = 1000,
+            resume: bool = False,
+            polish: bool = False,
+            polish_every: Optional[int] = None,
+            symmetric: Optional[bool] = None,
+            seed: Optional[int] = None,
+            initial_tour: Union[str, List[int]] = "random",
+            node_list: Optional[list] = None,
+            operator_selection: str = "all",
+            exploration: float = 0.1
     ):
         """Инициализация солвера для задачи о коммивояжере
 
@@ -42,60 +94,522 @@ class TSPSolver:
             temp_len (int): Длина списка температур
             p0 (float): изначальная вероятность (чем выше, тем выше начальные температуры)
             outer_limit (int): количество итераций для внешнего цикла
-            d (List[List[float]]): матрица расстояний между городами
-            input_pipe (Optional[Connection]): труба для передачи данных. По умолчанию None
+            d (List[List[float]] | numpy.ndarray | instance.DistanceOracle): матрица расстояний между городами
+            progress (Optional[progress.ProgressSender]): канал передачи прогресса решения (например, в интерфейс).
+                Кадры отправляются после итераций внешнего цикла не чаще, чем позволяет канал, и последний кадр -
+                по завершении run. По умолчанию None
+            tour_type (str): представление перестановки (list | tour). tour - двухуровневый список tour.Tour,
+                в котором операторы выполняются за O(sqrt(n)); полезен для задач с тысячами городов.
+                По умолчанию list
+            candidates (Optional[List[List[int]]]): списки ближайших соседей каждого города (см. модуль
+                candidates). Если заданы, ходы в основном выбираются так, чтобы город стал соседним с одним из
+                своих кандидатов. По умолчанию None (все ходы выбираются равномерно случайно)
+            uniform_share (float): доля равномерно случайных ходов при заданных candidates. По умолчанию 0.1
+            batch_size (int): количество пар индексов, оцениваемых за один шаг. Если больше 1, все 3 * batch_size
+                соседних решения оцениваются векторизованно (numpy) и выбирается лучшее из них; перестановка
+                хранится в numpy.ndarray, а индексы выбираются равномерно (списки кандидатов не поддерживаются).
+                По умолчанию 1
+            metrics (Optional[metrics.SolverMetrics]): объект для сбора метрик. По умолчанию None
+            checkpoint_file (Optional[str]): файл, в который через каждые checkpoint_every итераций внешнего цикла
+                в фоновом потоке сохраняется состояние солвера (см. save_checkpoint). По умолчанию None
+            checkpoint_every (int): количество итераций внешнего цикла между сохранениями. По умолчанию 1000
+            resume (bool): восстановить состояние из checkpoint_file вместо генерации изначального решения и
+                температур. Остальные параметры должны совпадать с параметрами прерванного запуска, тогда решение
+                продолжится так же, как без прерывания. По умолчанию False
+            polish (bool): по завершении run улучшить текущее решение локальным поиском (см. polish_tour).
+                По умолчанию False
+            polish_every (Optional[int]): улучшать текущее решение локальным поиском через каждые polish_every
+                итераций внешнего цикла. По умолчанию None (только по завершении, если polish=True)
+            symmetric (Optional[bool]): симметрична ли матрица расстояний. Для несимметричной матрицы (ATSP)
+                изменение длины при инверсии вычисляется за O(1) по префиксным суммам стоимостей пути в обоих
+                направлениях (tools.PathCosts); поддерживаются только представление list, batch_size=1 и
+                матрица расстояний без локального поиска. По умолчанию None (определяется по матрице)
+            seed (Optional[int]): зерно собственного генератора случайных чисел солвера (rng.RandomStream);
+                решение полностью воспроизводится по зерну и не зависит от других солверов. По умолчанию None
+                (зерно берется из модуля random, поэтому random.seed также делает запуск воспроизводимым)
+            initial_tour (str | List[int]): изначальное решение - готовая перестановка или способ ее построения:
+                random (случайная перестановка) или один из методов construction.CONSTRUCTORS (nearest_neighbor,
+                greedy, space_filling_curve), строящих маршрут по координатам городов. По умолчанию random
+            node_list (Optional[List[List[float]]]): координаты городов для построения изначального решения.
+                По умолчанию None (для оракула расстояний берутся его координаты)
+            operator_selection (str): all - на каждом шаге оцениваются все 3 оператора, adaptive - операторы,
+                доля принятых ходов которых среди оцененных ими соседних решений намного меньше, чем у лучшего
+                оператора, пропускаются, кроме шагов исследования (bandit.OperatorBandit). Только для
+                batch_size=1. По умолчанию all
+            exploration (float): вероятность шага исследования, на котором оцениваются все операторы, при
+                operator_selection=adaptive. По умолчанию 0.1
         """
-        self.d = d
+        self.metrics = metrics
+        start = metrics.start() if metrics is not None else None
+        if tour_type not in ("list", "tour"):
+            raise ValueError(f"Неизвестное представление перестановки: {tour_type}")
+        if batch_size > 1 and (tour_type != "list" or not isinstance(d, (np.ndarray, list)) or candidates is not None):
+            raise ValueError("Пакетная оценка ходов требует представления list и матрицы расстояний и не "
+                             "поддерживает списки кандидатов")
+        # Матрица в виде numpy-массива для векторизованной оценки ходов (для оракула расстояний - None)
+        self.__matrix = np.asarray(d) if isinstance(d, (np.ndarray, list)) else None
+        self.seed = seed if seed is not None else random.getrandbits(64)
+        self.__random = RandomStream(self.seed)
+        self.symmetric = tools.is_symmetric(d) if symmetric is None else symmetric
+        if not self.symmetric and (
+                tour_type != "list" or batch_size > 1 or self.__matrix is None or polish or polish_every
+        ):
+            raise ValueError("Несимметричная задача требует представления list, batch_size=1, матрицы расстояний "
+                             "и не поддерживает локальный поиск")
+        if operator_selection not in ("all", "adaptive"):
+            raise ValueError(f"Неизвестный способ выбора операторов: {operator_selection}")
+        if operator_selection == "adaptive" and batch_size > 1:
+            raise ValueError("Адаптивный выбор операторов не поддерживает пакетную оценку ходов")
+        self.operator_selection = operator_selection
+        self.operator_bandit = (
+            OperatorBandit(len(tools.OPERATORS), exploration) if operator_selection == "adaptive" else None
+        )
+        # Количество принятых ходов каждого оператора, а также активные операторы и количество шагов исследования
+        # в текущем внутреннем цикле (при operator_selection=adaptive)
+        self.__operator_wins = {apply: 0 for _, apply in tools.OPERATORS}
+        self.__active_operators = None
+        self.__exploration_steps = 0
+        self.__path_costs = None
+        # Позиции городов в перестановке-списке для выбора ходов по спискам кандидатов (pos[city] = index)
+        self.__positions = None
+        self.__operators = tools.OPERATORS
+        self.d = tools.as_rows(d)
         self.outer_limit = outer_limit
         self.inner_limit = temp_len
-        self.input_pipe = input_pipe
-        self.x = [x for x in range(len(self.d))]
-        random.shuffle(self.x)
+        self.progress = progress
+        self.tour_type = tour_type
+        self.candidates = candidates
+        self.uniform_share = uniform_share
+        self.batch_size = batch_size
+        self.checkpoint_file = checkpoint_file
+        self.checkpoint_every = checkpoint_every
+        self.__checkpoint_thread = None
+        self.polish = polish
+        self.polish_every = polish_every
+        self.__polish_neighbors = None
+        self.best_by_iterations = {}
+        self.outer_cntr = 0
+        self.stop_reason = None
+        self.construction_time = 0.0
+        if resume:
+            self.__load_checkpoint(checkpoint_file)
+            return
+
+        start_construction = time.perf_counter()
+        self.x = self.__make_tour(self.__construct_tour(initial_tour, node_list))
+        self.construction_time = time.perf_counter() - start_construction
+        self.__track_tour()
         self.f_x = tools.f(self.x, self.d)
+        self.best = self.f_x
+        self.best_x = None
+        self.__best_is_current = True  # True, если текущая перестановка x - лучшее решение
+        if metrics is not None:
+            metrics.stop("initialization", start)
+            start = metrics.start()
         self.temperature_list = self.__generate_temperature_list(temp_len, p0)
-        self.best = tools.f(self.x, self.d)
-        self.best_by_iterations = {}
+        if metrics is not None:
+            metrics.stop("temperature_list", start)
+
+    def run(
+            self,
+            time_limit: Optional[float] = None,
+            target: Optional[float] = None,
+            stagnation: Optional[int] = None
+    ) -> Tuple[List[int], float]:
+        """Решает задачу до достижения outer_limit итераций или одного из условий остановки
+
+        Args:
+            time_limit (Optional[float]): ограничение времени решения в секундах. По умолчанию нет
+            target (Optional[float]): длина маршрута, при достижении которой решение останавливается
+                (например, известный оптимум). По умолчанию нет
+            stagnation (Optional[int]): количество итераций внешнего цикла без улучшения лучшего решения,
+                после которого решение останавливается. По умолчанию нет
+
+        Returns:
+            Кортеж из лучшей найденной перестановки и ее длины
+        """
+        if time_limit is None and target is None and stagnation is None:
+            self.__outer_loop(self.outer_limit - self.outer_cntr)
+            self.stop_reason = "outer_limit"
+        else:
+            for _ in self.iterate(time_limit, target, stagnation, every=1):
+                pass
+        if self.polish:
+            self.polish_tour()
+        if self.progress is not None:
+            self.progress.update(self, force=True)
+        return self.best_tour(), self.best
+
+    def save_checkpoint(self, file_name: Optional[str] = None, background: bool = False):
+        """Сохраняет полное состояние солвера в файл
+
+        Сохраняются перестановка, лучшее решение, список температур, счетчик итераций и состояние генераторов
+        случайных чисел. Массивы записываются в двоичном формате numpy (.npz), скалярные значения - в JSON внутри
+        того же файла. Файл сначала записывается во временный файл, а затем атомарно заменяет старый, поэтому
+        прерывание во время записи не портит предыдущее сохранение. При background=True копия состояния делается
+        сразу, а запись на диск выполняется в фоновом потоке
+
+        Args:
+            file_name (Optional[str]): файл. По умолчанию checkpoint_file
+            background (bool): выполнять запись в фоновом потоке. По умолчанию False
+        """
+        file_name = file_name or self.checkpoint_file
+
+        def number(value):
+            # Значения целевой функции сохраняются без округления, скаляры numpy приводятся к типам Python для JSON
+            return value.item() if isinstance(value, np.generic) else value
+
+        meta = {
+            "version": self.CHECKPOINT_VERSION,
+            "f_x": number(self.f_x),
+            "best": number(self.best),
+            "best_is_current": self.__best_is_current,
+            "outer_cntr": self.outer_cntr,
+            "best_by_iterations": {str(key): number(value) for key, value in self.best_by_iterations.items()},
+            "random_state": self.__random.get_state(),
+            "operator_bandit": self.operator_bandit.get_state() if self.operator_bandit is not None else None,
+        }
+        arrays = {
+            "x": np.asarray(self.get_tour(), dtype=np.int32),
+            "best_x": np.asarray(self.best_x if self.best_x is not None else [], dtype=np.int32),
+            "temperatures": np.asarray(self.temperature_list.values(), dtype=np.float64),
+            "meta": np.frombuffer(json.dumps(meta).encode(), dtype=np.uint8),
+        }
+
+        def write():
+            tmp_name = f"{file_name}.{os.getpid()}.tmp"
+            with open(tmp_name, "wb") as file:
+                np.savez(file, **arrays)
+            os.replace(tmp_name, file_name)
+
+        # Предыдущая запись должна завершиться до начала новой
+        if self.__checkpoint_thread is not None:
+            self.__checkpoint_thread.join()
+            self.__checkpoint_thread = None
+        if background:
+            self.__checkpoint_thread = threading.Thread(target=write, daemon=True)
+            self.__checkpoint_thread.start()
+        else:
+            write()
+
+    def wait_checkpoint(self):
+        """Дожидается завершения фоновой записи состояния"""
+        if self.__checkpoint_thread is not None:
+            self.__checkpoint_thread.join()
+            self.__checkpoint_thread = None
+
+    def __load_checkpoint(self, file_name: str):
+        """Восстанавливает состояние солвера, сохраненное save_checkpoint"""
+        with np.load(file_name) as checkpoint:
+            meta = json.loads(checkpoint["meta"].tobytes().decode())
+            if meta["version"] != self.CHECKPOINT_VERSION:
+                raise ValueError(f"Неподдерживаемая версия сохранения: {meta['version']}")
+            self.x = self.__make_tour(checkpoint["x"].tolist())
+            self.__track_tour()
+            self.best_x = checkpoint["best_x"].tolist() or None
+            self.temperature_list = tools.TemperatureList(checkpoint["temperatures"].tolist())
+
+        self.f_x = meta["f_x"]
+        self.best = meta["best"]
+        self.__best_is_current = meta["best_is_current"]
+        self.outer_cntr = meta["outer_cntr"]
+        self.best_by_iterations = {int(key): value for key, value in meta["best_by_iterations"].items()}
+        self.__random.set_state(meta["random_state"])
+        if self.operator_bandit is not None and meta["operator_bandit"] is not None:
+            self.operator_bandit.set_state(meta["operator_bandit"])
+
+    def best_tour(self) -> List[int]:
+        """Возвращает копию лучшего найденного решения"""
+        return self.get_tour() if self.__best_is_current else list(self.best_x)
+
+    def iterate(
+            self,
+            time_limit: Optional[float] = None,
+            target: Optional[float] = None,
+            stagnation: Optional[int] = None,
+            every: int = 1
+    ):
+        """Решает задачу, возвращая снимки состояния через каждые every итераций внешнего цикла
+
+        Условия остановки проверяются после каждого снимка. Генератор можно прервать в любой момент,
+        а затем продолжить решение повторным вызовом run или iterate
+
+        Typical usage example:
+            for snapshot in solver.iterate(time_limit=10, every=100):
+                print(snapshot["outer_cntr"], snapshot["best"])
+
+        Args:
+            time_limit (Optional[float]): ограничение времени решения в секундах. По умолчанию нет
+            target (Optional[float]): длина маршрута, при достижении которой решение останавливается
+            stagnation (Optional[int]): количество итераций внешнего цикла без улучшения лучшего решения,
+                после которого решение останавливается
+            every (int): количество итераций внешнего цикла между снимками. По умолчанию 1
+
+        Yields:
+            Словарь с ключами outer_cntr, f_x, best и elapsed (время с начала вызова в секундах)
+        """
+        start = time.perf_counter()
+        best_seen = self.best
+        last_improvement = self.outer_cntr
+        self.stop_reason = None
+        while self.outer_cntr < self.outer_limit:
+            self.__outer_loop(min(every, self.outer_limit - self.outer_cntr))
+            best = self.best
+            if best < best_seen:
+                best_seen, last_improvement = best, self.outer_cntr
+            elapsed = time.perf_counter() - start
+
+            yield {"outer_cntr": self.outer_cntr, "f_x": self.f_x, "best": best, "elapsed": elapsed}
+
+            if target is not None and best <= target:
+                self.stop_reason = "target"
+            elif time_limit is not None and elapsed >= time_limit:
+                self.stop_reason = "time_limit"
+            elif stagnation is not None and self.outer_cntr - last_improvement >= stagnation:
+                self.stop_reason = "stagnation"
+            if self.stop_reason is not None:
+                return
+
+        self.stop_reason = "outer_limit"
+
+    def advance(self, iterations: int) -> bool:
+        """Выполняет очередные iterations итераций внешнего цикла (но не больше outer_limit всего)
+
+        Args:
+            iterations (int): количество итераций
+
+        Returns:
+            True, если лимит итераций внешнего цикла еще не достигнут
+        """
+        self.__outer_loop(min(iterations, self.outer_limit - self.outer_cntr))
+        return self.outer_cntr < self.outer_limit
+
+    def adopt(self, x: List[int], temperatures: Optional[List[float]] = None):
+        """Заменяет текущее решение (и, если передан, список температур) на полученное извне
+
+        Args:
+            x (List[int]): новая перестановка
+            temperatures (Optional[List[float]]): новый список температур. По умолчанию список не меняется
+        """
+        if self.__best_is_current:
+            self.best_x, self.__best_is_current = self.get_tour(), False
+        self.x = self.__make_tour(list(x))
+        self.__track_tour()
+        self.f_x = tools.f(self.x, self.d)
+        if self.f_x < self.best:
+            self.best, self.__best_is_current = self.f_x, True
+        if temperatures is not None:
+            self.temperature_list = tools.TemperatureList(temperatures)
 
-    def run(self) -> float:
-        self.__outer_loop()
-        return self.f_x
+    def polish_tour(self) -> float:
+        """Улучшает текущее решение локальным поиском 2-opt и Or-opt до локального минимума (см. local_search)
+
+        Списки соседей берутся из candidates, а если они не заданы, строятся один раз при первом вызове
+        (POLISH_NEIGHBORS ближайших городов)
+
+        Returns:
+            Изменение длины текущего решения (не больше 0)
+        """
+        start = self.metrics.start() if self.metrics is not None else None
+        if self.__polish_neighbors is None:
+            if self.candidates is not None:
+                self.__polish_neighbors = self.candidates
+            elif self.__matrix is not None:
+                self.__polish_neighbors = candidate_lists.nearest_neighbors_from_matrix(
+                    self.__matrix, self.POLISH_NEIGHBORS
+                )
+            else:
+                self.__polish_neighbors = candidate_lists.nearest_neighbors(self.d.coords, self.POLISH_NEIGHBORS)
+
+        x = self.get_tour()
+        delta = local_search.polish(x, self.d, self.__polish_neighbors)
+        if delta < 0:
+            # Локальный поиск только улучшает решение, поэтому снимок лучшего решения не нужен
+            self.x = self.__make_tour(x)
+            self.__track_tour()
+            self.f_x += delta
+            if self.f_x < self.best:
+                self.best, self.__best_is_current = self.f_x, True
+        if self.metrics is not None:
+            self.metrics.stop("polish", start)
+        return delta
+
+    def __construct_tour(self, initial_tour: Union[str, List[int]], node_list: Optional[list]) -> List[int]:
+        """Возвращает изначальную перестановку (см. параметр initial_tour)
+
+        Raises:
+            ValueError: неизвестный способ построения, нет координат городов или перестановка некорректна
+        """
+        n = len(self.d)
+        if not isinstance(initial_tour, str):
+            x = list(initial_tour)
+            if sorted(x) != list(range(n)):
+                raise ValueError("Изначальное решение должно быть перестановкой всех городов")
+            return x
+        if initial_tour == "random":
+            return self.__random.permutation(n)
+        if initial_tour not in construction.CONSTRUCTORS:
+            raise ValueError(f"Неизвестный способ построения изначального решения: {initial_tour}")
+        if node_list is None:
+            node_list = getattr(self.d, "coords", None)
+        if node_list is None:
+            raise ValueError(f"Для построения изначального решения ({initial_tour}) нужны координаты городов")
+        return construction.CONSTRUCTORS[initial_tour](node_list)
+
+    def __track_tour(self):
+        """Строит вспомогательные структуры для текущей перестановки
+
+        Префиксные суммы стоимостей пути строятся только для несимметричной задачи, а позиции городов - только
+        для перестановки-списка при заданных списках кандидатов (в tour.Tour позиция города хранится сама)
+        """
+        if self.candidates is not None and isinstance(self.x, list):
+            self.__positions = [0] * len(self.x)
+            for index, city in enumerate(self.x):
+                self.__positions[city] = index
+        if not self.symmetric:
+            self.__path_costs = tools.PathCosts(self.x, self.__matrix)
+            self.__operators = ((self.__path_costs.delta_inverse, tools.apply_inverse),) + tools.OPERATORS[1:]
+
+    def __make_tour(self, x: List[int]):
+        """Возвращает перестановку x в выбранном представлении (list | tour, numpy.ndarray для пакетной оценки)"""
+        if self.batch_size > 1:
+            return np.array(x, dtype=np.int64)
+        return tour.Tour(x) if self.tour_type == "tour" else x
+
+    def get_tour(self) -> List[int]:
+        """Возвращает копию текущей перестановки x в виде списка"""
+        return self.x.tolist() if isinstance(self.x, np.ndarray) else list(self.x)
+
+    def temperatures(self) -> List[float]:
+        """Возвращает значения температур из списка температур"""
+        return self.temperature_list.values()
 
     def __get_best_from_neighboring_solutions(self):
-        """Генерирует соседние решения и возвращает лучшее из них.
+        """Оценивает соседние решения и возвращает лучший ход.
 
-        Генерируется 2 индекса, а затем при помощи операторов инверсии, вставки и замены (из модуля tools)
-        генерируются соседние решения. Затем вычисляются значения целевой функции и возвращается перестановка с
-        наименьшим значением.
+        Генерируется 2 индекса, а затем для операторов инверсии, вставки и замены (из модуля tools) вычисляется
+        изменение целевой функции. Соседние перестановки при этом не строятся: лучший ход применяется к x
+        только после того, как он будет принят (см. __apply_move).
 
         Returns:
             Кортеж из 2 элементов:
-                - List[int]: лучшая соседняя перестановка;
-                - float: значение целевой функции для данной перестановки
+                - Tuple[Callable, int, int]: лучший ход (функция применения оператора и индексы i, j);
+                - float: значение целевой функции для перестановки, полученной этим ходом
         """
-        # Генерация 2 случайных индексов
-        indices = set()
-        while len(indices) < 2:
-            indices.add(random.randrange(len(self.d)))
-        i, j = sorted(list(indices))  # i < j
+        i, j = self.__get_indices()  # i < j
+
+        # Жадный выбор оптимального из 3 соседей (при равенстве выбирается оператор, стоящий раньше)
+        best_delta, best_apply = None, None
+        for delta, apply in self.__operators:
+            cur_delta = delta(self.x, i, j, self.d)
+            if best_delta is None or cur_delta < best_delta:
+                best_delta, best_apply = cur_delta, apply
+
+        return (best_apply, i, j), self.f_x + best_delta
+
+    def __get_best_from_selected_operators(self):
+        """Оценивает соседние решения только для активных операторов operator_bandit и возвращает лучший ход
+
+        На шаге исследования (с вероятностью operator_bandit.exploration) оцениваются все операторы. Количество
+        шагов исследования сохраняется для обновления статистики
+
+        Returns:
+            Кортеж того же вида, что и __get_best_from_neighboring_solutions
+        """
+        i, j = self.__get_indices()  # i < j
+        operators = self.__active_operators
+        if self.__random.random() < self.operator_bandit.exploration:
+            operators = self.__operators
+            self.__exploration_steps += 1
+
+        best_delta, best_apply = None, None
+        for delta, apply in operators:
+            cur_delta = delta(self.x, i, j, self.d)
+            if best_delta is None or cur_delta < best_delta:
+                best_delta, best_apply = cur_delta, apply
+
+        return (best_apply, i, j), self.f_x + best_delta
 
-        # Генерация соседних решений
-        y1 = tools.inverse_op(self.x, i, j)
-        y2 = tools.insert_op(self.x, i, j)
-        y3 = tools.swap_op(self.x, i, j)
+    def __get_best_from_batch(self):
+        """Векторизованно оценивает соседние решения для batch_size пар индексов и возвращает лучший ход
 
-        # Вычисление целевых функций для соседних решений
-        f_y1 = tools.f_inverse(self.x, self.f_x, y1, i, j, self.d)
-        f_y2 = tools.f_insert(self.x, self.f_x, y2, i, j, self.d)
-        f_y3 = tools.f_swap(self.x, self.f_x, y3, i, j, self.d)
+        Returns:
+            Кортеж того же вида, что и __get_best_from_neighboring_solutions
+        """
+        i, j = self.__sample_pairs(self.batch_size)
+        deltas = tools.batch_deltas(self.x, i, j, self.__matrix)
+        op, k = np.unravel_index(np.argmin(deltas), deltas.shape)  # при равенстве - первый оператор и пара
+        return (tools.OPERATORS[op][1], int(i[k]), int(j[k])), self.f_x + deltas[op, k].item()
+
+    def __sample_pairs(self, size: int):
+        """Равномерно выбирает size пар индексов i < j
+
+        Returns:
+            Кортеж из 2 массивов индексов (i < j поэлементно)
+        """
+        return self.__random.pairs(len(self.x), size)
+
+    def __get_indices(self):
+        """Выбирает пару индексов i < j для операторов
+
+        Без списков кандидатов (и с вероятностью uniform_share при их наличии) индексы выбираются равномерно
+        случайно. Иначе выбирается случайный город a и случайный кандидат b из его списка, а индексы
+        выбираются так, чтобы после применения оператора b оказался рядом с a
+
+        Returns:
+            Кортеж из 2 индексов (i < j)
+        """
+        if self.candidates is not None and self.__random.random() >= self.uniform_share:
+            n = len(self.x)
+            pos_a = self.__random.randrange(n)
+            a = self.x[pos_a]
+            if self.candidates[a]:
+                b = self.__random.choice(self.candidates[a])
+                pos_b = self.__positions[b] if self.__positions is not None else tools.position(self.x, b)
+                # a стоит раньше b: b переносится (разворачивается) на позицию сразу после a,
+                # b стоит раньше a: участок от b до города перед a разворачивается
+                i, j = (pos_a + 1, pos_b) if pos_a < pos_b else (pos_b, pos_a - 1)
+                if i < j:
+                    return i, j
+
+        # Генерация 2 случайных индексов
+        return self.__random.pair(len(self.x))
 
-        # Жадный выбор оптимального из 3 соседей (возвращается соседнее решение с наименьшей целевой функцией f)
-        return sorted([(y1, f_y1), (y2, f_y2), (y3, f_y3)], key = lambda item: item[1])[0]
+    def __apply_move(self, move, f_y: float):
+        """Применяет принятый ход к текущей перестановке на месте
 
-    def __generate_temperature_list(self, temp_len: int, p0: float) -> List[tools.Temperature]:
+        Args:
+            move (Tuple[Callable, int, int]): ход, полученный из __get_best_from_neighboring_solutions
+            f_y (float): значение целевой функции после применения хода
+        """
+        apply, i, j = move
+        # Снимок лучшего решения делается лениво: только перед тем, как его испортит ухудшающий ход
+        if f_y > self.f_x and self.__best_is_current:
+            self.best_x, self.__best_is_current = self.get_tour(), False
+        apply(self.x, i, j)
+        if self.__positions is not None:
+            # Позиции изменились только у городов на участке с i по j (при замене - только у двух городов)
+            positions, x = self.__positions, self.x
+            if apply is tools.apply_swap:
+                positions[x[i]], positions[x[j]] = i, j
+            else:
+                for index in range(i, j + 1):
+                    positions[x[index]] = index
+        if self.__path_costs is not None:
+            self.__path_costs.update(self.x, i, j, apply)
+        self.f_x = f_y
+        if f_y < self.best:
+            self.best, self.__best_is_current = f_y, True
+
+    def __generate_temperature_list(self, temp_len: int, p0: float) -> tools.TemperatureList:
         """Генерирует изначальные температуры
 
-        Создается двоичная куча. После этого ищутся соседние решения и в кучу добавляется температура, рассчитанная
-        по формуле, учитывающей целевое значение изначальной перестановки и лучшей полученной соседней перестановки
+        Ищутся соседние решения и для каждого вычисляется температура по формуле, учитывающей целевое значение
+        изначальной перестановки и лучшей полученной соседней перестановки. Каждое улучшающее соседнее решение
+        сразу заменяет текущее, как в статье, поэтому соседние решения оцениваются последовательно, а
+        векторизованно вычисляются только температуры. Каждая температура получается из одной пары индексов и при
+        batch_size > 1 (лучший ход из пакета дал бы заниженные температуры). Из температур создается список
+        температур.
 
         Args:
             temp_len (int): длина списка температур
@@ -104,39 +618,55 @@ class TSPSolver:
         Returns:
             Список температур, полученных по формуле -abs(f_for_neighboring_solution - f_current) / math.log(p0)
         """
-        temperature_list = []
-        heapq.heapify(temperature_list)
-
-        while len(temperature_list) < temp_len:
-            y, f_y = self.__get_best_from_neighboring_solutions()
-            heapq.heappush(temperature_list, tools.Temperature(-abs(f_y - self.f_x) / math.log(p0)))
+        # Изменения целевой функции для лучших соседних решений; температуры по ним вычисляются векторизованно
+        deltas = np.empty(temp_len, dtype=np.float64)
+        for k in range(temp_len):
+            move, f_y = self.__get_best_from_neighboring_solutions()
+            deltas[k] = f_y - self.f_x
             # Если решение лучше текущего, то происходит замена текущего решения на лучшее
             if f_y < self.f_x:
-                self.x, self.f_x = y, f_y
+                self.__apply_move(move, f_y)
 
-        return temperature_list
+        return tools.TemperatureList((-np.abs(deltas) / math.log(p0)).tolist())
 
-    def __outer_loop(self):
+    def __outer_loop(self, iterations: int):
         """Выполняет внешний цикл алгоритма имитации отжига.
 
         В каждой итерации генерируется новая температура при помощи исполнения внутреннего цикла. Если
         температура сгенерирована успешно, то она заменяет одну из температур в списке температур
+
+        Args:
+            iterations (int): количество итераций, которые нужно выполнить
         """
-        outer_cntr = 0
-        while outer_cntr < self.outer_limit:
+        metrics = self.metrics
+        stop = self.outer_cntr + iterations
+        while self.outer_cntr < stop:
             # Запись лучшего решения на определенном количестве итераций
-            if outer_cntr % 100 == 0 and outer_cntr != 0:
-                self.best_by_iterations[outer_cntr] = self.best
+            if self.outer_cntr % 100 == 0 and self.outer_cntr != 0:
+                self.best_by_iterations[self.outer_cntr] = self.best
 
+            if metrics is not None:
+                start = metrics.start()
             new_temperature = self.__inner_loop()
             if new_temperature is not None:
-                heapq.heappop(self.temperature_list)
-                heapq.heappush(self.temperature_list, tools.Temperature(new_temperature))
+                self.temperature_list.replace_max(new_temperature)
+
+            self.outer_cntr += 1
+            if self.polish_every and self.outer_cntr % self.polish_every == 0:
+                self.polish_tour()
+
+            if metrics is not None:
+                metrics.iteration_time.append(metrics.stop("outer_loop", start))
+                if self.outer_cntr % metrics.temperature_stats_every == 0:
+                    metrics.temperature_stats.append({"iteration": self.outer_cntr, **self.temperature_list.stats()})
+                if metrics.callback is not None:
+                    metrics.callback(self.outer_cntr, metrics)
 
-            outer_cntr += 1
+            if self.checkpoint_file and self.outer_cntr % self.checkpoint_every == 0:
+                self.save_checkpoint(background=True)
 
-            if self.input_pipe and outer_cntr % 500 == 0:  # передача данных по трубе
-                self.input_pipe.send((self.x, outer_cntr, self.best))
+            if self.progress is not None:
+                self.progress.update(self)
 
     def __inner_loop(self) -> Optional[float]:
         """Выполняет один внутренний цикл алгоритма имитации отжига.
@@ -152,27 +682,60 @@ class TSPSolver:
         """
         total_t = 0     # сумма температур, вычисленных для каждого принятого соседнего решения
         number_of_t = 0    # количество температур
+        number_of_improving = 0    # количество принятых неухудшающих решений
         inner_cntr = 0
-        temperature = self.temperature_list[0].value
+        temperature = self.temperature_list.max()
+        bandit = self.operator_bandit
+        # Пока все операторы активны, шаги адаптивного выбора не отличаются от обычных
+        if bandit is not None and bandit.rare:
+            self.__active_operators = [self.__operators[k] for k in bandit.active]
+            self.__exploration_steps = 0
+            get_best = self.__get_best_from_selected_operators
+        elif self.batch_size > 1:
+            get_best = self.__get_best_from_batch
+        else:
+            get_best = self.__get_best_from_neighboring_solutions
+        # Принятые ходы операторов считаются только для статистики операторов и метрик
+        wins = self.__operator_wins if self.operator_bandit is not None or self.metrics is not None else None
 
         while inner_cntr < self.inner_limit:
-            y, f_y = self.__get_best_from_neighboring_solutions()
+            move, f_y = get_best()
             if f_y <= self.f_x:
-                self.x, self.f_x = y, f_y
+                self.__apply_move(move, f_y)
+                number_of_improving += 1
+                if wins is not None:
+                    wins[move[0]] += 1
             else:
-                p = math.exp(-(f_y - self.f_x) / temperature)  # вероятность принятия соседнего решения
-                r = 1
-                while r == 1:  # r == 1 -> math.log(r) == 0 -> error (ZeroDivisionError)
-                    r = random.random()
-                # Симуляция принятия соседнего решения
-                if r < p:
-                    self.best = min(f_y, self.f_x, self.best)
-                    total_t -= (f_y - self.f_x) / math.log(r)
-                    self.x, self.f_x = y, f_y
+                # Ход принимается с вероятностью exp(-(f_y - f_x) / t): условие r < exp(-(f_y - f_x) / t)
+                # для равномерного r равносильно f_y - f_x < t * e, где e = -log(r) - экспоненциальная величина
+                e = self.__random.exponential()
+                if f_y - self.f_x < temperature * e:
+                    total_t += (f_y - self.f_x) / e
+                    self.__apply_move(move, f_y)
                     number_of_t += 1
+                    if wins is not None:
+                        wins[move[0]] += 1
 
             inner_cntr += 1
 
+        if bandit is not None:
+            # Активные операторы оцениваются на каждом шаге, пропускаемые - только на шагах исследования
+            evaluated = [
+                self.__exploration_steps if k in bandit.rare else self.inner_limit for k in range(len(self.__operators))
+            ]
+            moves_evaluated = sum(evaluated)
+            bandit.update(evaluated, [wins[apply] for _, apply in self.__operators])
+        else:
+            moves_evaluated = len(self.__operators) * self.batch_size * self.inner_limit
+        if self.metrics is not None:
+            self.metrics.moves_evaluated += moves_evaluated
+            self.metrics.accepted_improving += number_of_improving
+            self.metrics.accepted_worsening += number_of_t
+            for apply, count in wins.items():
+                self.metrics.count_win(apply, count)
+        if wins is not None:
+            self.__operator_wins = dict.fromkeys(wins, 0)
+
         if number_of_t == 0:
             return None
         else:
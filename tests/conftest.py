@@ -0,0 +1,32 @@
+import os
+
+import pytest
+
+from instance import TSP_INSTANCE
+
+BENCHMARKS = os.path.join(os.path.dirname(__file__), "..", "data", "benchmarks")
+
+
+def load_benchmark(name: str) -> TSP_INSTANCE:
+    problem = TSP_INSTANCE(os.path.join(BENCHMARKS, name), cache_dir=None)
+    # Задача разбирается один раз на все тесты, поэтому матрица защищена от изменения в одном из них
+    problem.d.flags.writeable = False
+    return problem
+
+
+@pytest.fixture(scope="session")
+def benchmarks() -> str:
+    """Папка с эталонными задачами"""
+    return BENCHMARKS
+
+
+@pytest.fixture(scope="session")
+def berlin52() -> TSP_INSTANCE:
+    """Задача berlin52 (52 города)"""
+    return load_benchmark("berlin52.tsp")
+
+
+@pytest.fixture(scope="session")
+def a280() -> TSP_INSTANCE:
+    """Задача a280 (280 городов)"""
+    return load_benchmark("a280.tsp")
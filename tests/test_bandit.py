@@ -0,0 +1,25 @@
+import pytest
+
+from bandit import OperatorBandit
+
+
+def test_operator_bandit():
+    bandit = OperatorBandit(3, exploration=0.2)
+    assert (bandit.active, bandit.rare) == ([0, 1, 2], [])
+
+    # Оператор, побеждающий намного реже лучшего, пропускается, а второй по успешности остается активным
+    for _ in range(50):
+        bandit.update([1000, 1000, 1000], [200, 60, 2])
+    assert (bandit.active, bandit.rare) == ([0, 1], [2])
+
+    # На шагах исследования пропускаемый оператор снова становится успешным и возвращается в активные
+    for _ in range(50):
+        bandit.update([1000, 1000, 100], [200, 60, 30])
+    assert (bandit.active, bandit.rare) == ([0, 1, 2], [])
+
+    restored = OperatorBandit(3)
+    restored.set_state(bandit.get_state())
+    assert (restored.rates, restored.active, restored.rare) == (bandit.rates, bandit.active, bandit.rare)
+
+    with pytest.raises(ValueError):
+        OperatorBandit(3, exploration=1.5)
@@ -0,0 +1,22 @@
+import json
+import os
+
+from batch import main, read_jobs
+
+
+def test_batch(tmp_path, benchmarks):
+    jobs = tmp_path / "jobs.jsonl"
+    jobs.write_text(
+        json.dumps({"instance": os.path.join(benchmarks, "berlin52.tsp"), "temp_len": 20, "outer_limit": 30}) + "\n"
+        + "\n"
+        + json.dumps({"id": "missing", "instance": str(tmp_path / "missing.tsp")}) + "\n"
+    )
+    assert [job["id"] for job in read_jobs(str(jobs))] == [1, "missing"]
+
+    output = tmp_path / "results.jsonl"
+    assert main([str(jobs), "--processes", "2", "--output", str(output), "--no-cache"]) == 1
+    results = {result["id"]: result for result in map(json.loads, output.read_text().splitlines())}
+    assert results[1]["p0"] == 0.1
+    assert sorted(results[1]["tour"]) == list(range(52))
+    assert results[1]["length"] > 0
+    assert "error" in results["missing"]
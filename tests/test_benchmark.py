@@ -0,0 +1,26 @@
+import os
+
+from benchmark import find_regressions, format_results, run_benchmark
+
+
+def test_run_benchmark(benchmarks):
+    task = (os.path.join(benchmarks, "berlin52.tsp"), (50, 0.1, 20), 1, 7542, [1000.0, 0.0])
+    result = run_benchmark(task, cache_dir=None)
+    assert result["instance"] == "berlin52"
+    assert result["gap"] == (result["length"] - 7542) / 7542 * 100
+    assert result["time_to_within"]["1000.0"] is not None
+    assert result["time_to_within"]["0.0"] is None
+    assert result["moves_per_sec"] > 0
+    # Время достижения отклонения отсчитывается от начала решения, без загрузки задачи
+    assert result["time_to_within"]["1000.0"] <= result["solve_time"]
+
+    # Без итераций внешнего цикла скорость не определена
+    result = run_benchmark((task[0], (50, 0.1, 0), 1, 7542, [1000.0]), cache_dir=None)
+    assert result["moves_per_sec"] is None
+    assert "berlin52" in format_results([result])
+
+
+def test_find_regressions():
+    old = {"instance": "a", "temp_len": 1, "p0": 0.1, "outer_limit": 1, "seed": 1, "gap": 1.0, "moves_per_sec": 1000}
+    assert find_regressions([dict(old, gap=1.2, moves_per_sec=950)], [old], 0.5, 10) == []
+    assert len(find_regressions([dict(old, gap=2.0, moves_per_sec=800)], [old], 0.5, 10)) == 2
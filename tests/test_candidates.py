@@ -0,0 +1,40 @@
+import math
+import random
+
+import numpy as np
+
+from candidates import SpatialGrid, nearest_neighbors, nearest_neighbors_from_matrix
+
+
+def test_nearest_neighbors():
+    size, k = 300, 8
+    node_list = [[random.uniform(0, 1000), random.uniform(0, 100)] for _ in range(size)]
+    neighbors = nearest_neighbors(node_list, k)
+    matrix_neighbors = nearest_neighbors_from_matrix(
+        [[math.dist(a, b) for b in node_list] for a in node_list], k
+    )
+    for city in range(size):
+        expected = sorted(math.dist(node_list[city], node) for i, node in enumerate(node_list) if i != city)[:k]
+        assert city not in neighbors[city]
+        assert [math.dist(node_list[city], node_list[other]) for other in neighbors[city]] == expected
+        assert [math.dist(node_list[city], node_list[other]) for other in matrix_neighbors[city]] == expected
+
+
+def test_spatial_grid():
+    node_list = [[random.uniform(0, 1000), random.uniform(0, 100)] for _ in range(200)]
+    grid = SpatialGrid(np.asarray(node_list))
+    # Кольца вокруг любой ячейки до радиуса cells_per_side перебирают каждый город ровно один раз
+    for city in (0, 57, 199):
+        found = [other for radius in range(grid.cells_per_side + 1) for other in grid.ring(grid.cell_of[city], radius)]
+        assert sorted(found) == list(range(200))
+    # Города за пределами колец до radius не ближе radius * cell_size, поэтому covers может остановить поиск
+    city = 7
+    for radius in range(grid.cells_per_side):
+        inside = {other for r in range(radius + 1) for other in grid.ring(grid.cell_of[city], r)}
+        outside = [math.dist(node_list[city], node) for other, node in enumerate(node_list) if other not in inside]
+        assert all(distance >= radius * grid.cell_size for distance in outside)
+    assert grid.covers(0, 0.0) and grid.covers(grid.cells_per_side, math.inf)
+    assert not grid.covers(1, 2 * grid.cell_size)
+
+    grid.remove(city)
+    assert city not in grid.cells[grid.cell_of[city]]
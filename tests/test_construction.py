@@ -0,0 +1,30 @@
+import pytest
+
+import construction
+from rng import RandomStream
+from solver import TSPSolver
+from tools import f
+
+
+@pytest.mark.parametrize("method", sorted(construction.CONSTRUCTORS))
+def test_constructors(method, a280):
+    tour = construction.CONSTRUCTORS[method](a280.node_list)
+    assert sorted(tour) == list(range(len(a280.node_list)))
+    # Построенный маршрут намного короче случайного
+    assert f(tour, a280.d) < f(RandomStream(1).permutation(len(tour)), a280.d) / 4
+
+
+def test_solver_initial_tour(berlin52):
+    tour = construction.greedy_edge_tour(berlin52.node_list)
+    # При генерации списка температур к изначальному маршруту применяются только улучшающие ходы
+    solver = TSPSolver(20, 0.1, 10, berlin52.d, initial_tour="greedy", node_list=berlin52.node_list, seed=1)
+    assert solver.best <= f(tour, berlin52.d)
+    assert solver.construction_time > 0
+    assert TSPSolver(20, 0.1, 10, berlin52.d, initial_tour=tour).best <= f(tour, berlin52.d)
+
+    with pytest.raises(ValueError):
+        TSPSolver(20, 0.1, 10, berlin52.d, initial_tour="greedy")
+    with pytest.raises(ValueError):
+        TSPSolver(20, 0.1, 10, berlin52.d, initial_tour="unknown", node_list=berlin52.node_list)
+    with pytest.raises(ValueError):
+        TSPSolver(20, 0.1, 10, berlin52.d, initial_tour=tour[:-1])
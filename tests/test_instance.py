@@ -0,0 +1,158 @@
+import math
+import os
+import pickle
+import random
+
+import numpy as np
+
+from instance import DistanceOracle, TSP_INSTANCE
+from solver import TSPSolver
+from tools import as_rows, f
+
+
+def test_distance_matrix(berlin52):
+    n = len(berlin52.node_list)
+    assert berlin52.d.shape == (n, n)
+    assert berlin52.d.dtype == np.int32
+    assert (berlin52.d == berlin52.d.T).all()
+    for i in range(n):
+        for j in range(n):
+            (x1, y1), (x2, y2) = berlin52.node_list[i], berlin52.node_list[j]
+            assert berlin52.d[i, j] == int(math.sqrt((x1 - x2) ** 2 + (y1 - y2) ** 2) + 0.5)
+
+
+def test_as_rows(berlin52):
+    rows = as_rows(berlin52.d)
+    assert len(rows) == len(berlin52.d)
+    assert rows[3][17] == berlin52.d[3, 17]
+    assert type(rows[3][17]) is int
+
+
+def test_distance_oracle(berlin52, benchmarks):
+    oracle = TSP_INSTANCE(
+        os.path.join(benchmarks, "berlin52.tsp"), distance_mode="oracle", cache_size=4, cache_dir=None
+    ).d
+    assert isinstance(oracle, DistanceOracle)
+    assert len(oracle) == len(berlin52.d)
+    for i in range(len(berlin52.d)):
+        for j in range(len(berlin52.d)):
+            assert oracle[i][j] == berlin52.d[i, j]
+    # Строки целиком вычисляются векторизованно и хранятся в ограниченном кэше
+    for i in list(range(len(berlin52.d))) * 2:
+        assert list(oracle.row(i)) == berlin52.d[i].tolist()
+    perm = list(range(len(berlin52.d)))
+    assert f(perm, oracle) == f(perm, as_rows(berlin52.d))
+
+    restored = pickle.loads(pickle.dumps(oracle))
+    assert restored[5][7] == berlin52.d[5, 7]
+
+
+def test_cache(tmp_path, benchmarks):
+    file_name = os.path.join(benchmarks, "berlin52.tsp")
+    # Файлы кэша старых версий удаляются при записи в кэш, другие файлы в папке не затрагиваются
+    stale = ["0" * 64 + ".json", "v1_" + "a" * 64 + "_d.npy"]
+    for name in stale + ["notes.txt"]:
+        (tmp_path / name).write_text("")
+    parsed = TSP_INSTANCE(file_name, cache_dir=str(tmp_path))
+    assert not any((tmp_path / name).exists() for name in stale)
+    assert (tmp_path / "notes.txt").exists()
+    cached = TSP_INSTANCE(file_name, cache_dir=str(tmp_path))
+    assert isinstance(cached.d, np.memmap)
+    assert cached.attributes == parsed.attributes
+    assert cached.node_list == parsed.node_list
+    assert (cached.d == parsed.d).all()
+    assert as_rows(cached.d)[3][17] == parsed.d[3, 17]
+
+
+def write_explicit_instance(path, d, edge_weight_format, problem_type="TSP"):
+    n = len(d)
+    if edge_weight_format == "FULL_MATRIX":
+        rows = [d[i] for i in range(n)]
+    elif edge_weight_format in ("UPPER_ROW", "LOWER_COL"):
+        rows = [d[i][i + 1:] for i in range(n)]
+    elif edge_weight_format in ("LOWER_ROW", "UPPER_COL"):
+        rows = [d[i][:i] for i in range(n)]
+    elif edge_weight_format in ("UPPER_DIAG_ROW", "LOWER_DIAG_COL"):
+        rows = [d[i][i:] for i in range(n)]
+    else:
+        rows = [d[i][:i + 1] for i in range(n)]
+    # Веса записываются по 4 в строке, независимо от границ строк матрицы
+    weights = [str(w) for row in rows for w in row]
+    lines = [" ".join(weights[k:k + 4]) for k in range(0, len(weights), 4)]
+    path.write_text(
+        f"NAME : test\nTYPE : {problem_type}\nCOMMENT : a: b\nDIMENSION : {n}\nEDGE_WEIGHT_TYPE : EXPLICIT\n"
+        f"EDGE_WEIGHT_FORMAT : {edge_weight_format}\nEDGE_WEIGHT_SECTION\n" + "\n".join(lines) + "\nEOF\n"
+    )
+
+
+def test_explicit_formats(tmp_path):
+    size = 7
+    d = [[0] * size for _ in range(size)]
+    for i in range(size):
+        for j in range(i):
+            d[i][j] = d[j][i] = random.randrange(1, 1000)
+
+    for edge_weight_format in (
+        "FULL_MATRIX", "UPPER_ROW", "LOWER_ROW", "UPPER_DIAG_ROW", "LOWER_DIAG_ROW",
+        "UPPER_COL", "LOWER_COL", "UPPER_DIAG_COL", "LOWER_DIAG_COL",
+    ):
+        path = tmp_path / f"{edge_weight_format}.tsp"
+        write_explicit_instance(path, d, edge_weight_format)
+        problem = TSP_INSTANCE(str(path), cache_dir=None)
+        assert problem.attributes["COMMENT"] == "a: b"
+        assert problem.node_list is None
+        assert problem.d.tolist() == d
+        # Веса не хранятся после построения матрицы, поэтому память под расстояния не удваивается
+        assert not hasattr(problem, "_TSP_INSTANCE__weights")
+
+
+def test_atsp(tmp_path):
+    size = 12
+    d = [[0 if i == j else random.randrange(1, 1000) for j in range(size)] for i in range(size)]
+    path = tmp_path / "test.atsp"
+    write_explicit_instance(path, d, "FULL_MATRIX", problem_type="ATSP")
+    problem = TSP_INSTANCE(str(path), cache_dir=None)
+    assert problem.d.tolist() == d
+
+    solver = TSPSolver(20, 0.1, 30, problem.d)
+    assert not solver.symmetric
+    tour, length = solver.run()
+    assert length == f(tour, d)
+    assert solver.f_x == f(solver.get_tour(), d)
+
+
+def test_coordinate_metrics(tmp_path):
+    nodes = [[38.24, 20.42], [39.57, 26.15], [40.56, 25.32], [36.26, 23.12], [-33.55, 151.10]]
+
+    def reference_geo(node1, node2):
+        def to_radians(x):
+            degrees = int(x)
+            return 3.141592 * (degrees + 5.0 * (x - degrees) / 3.0) / 180.0
+
+        lat1, lon1, lat2, lon2 = map(to_radians, (*node1, *node2))
+        q1 = math.cos(lon1 - lon2)
+        q2 = math.cos(lat1 - lat2)
+        q3 = math.cos(lat1 + lat2)
+        return int(6378.388 * math.acos(0.5 * ((1.0 + q1) * q2 - (1.0 - q1) * q3)) + 1.0)
+
+    def reference_att(node1, node2):
+        r = math.sqrt(((node1[0] - node2[0]) ** 2 + (node1[1] - node2[1]) ** 2) / 10.0)
+        t = int(r + 0.5)
+        return t + 1 if t < r else t
+
+    def reference_ceil(node1, node2):
+        return math.ceil(math.sqrt((node1[0] - node2[0]) ** 2 + (node1[1] - node2[1]) ** 2))
+
+    for edge_weight_type, reference in (("GEO", reference_geo), ("ATT", reference_att), ("CEIL_2D", reference_ceil)):
+        path = tmp_path / f"{edge_weight_type}.tsp"
+        path.write_text(
+            f"NAME: test\nTYPE: TSP\nDIMENSION: {len(nodes)}\nEDGE_WEIGHT_TYPE: {edge_weight_type}\n"
+            "NODE_COORD_SECTION\n" + "\n".join(f"{k + 1} {x} {y}" for k, (x, y) in enumerate(nodes)) + "\nEOF\n"
+        )
+        problem = TSP_INSTANCE(str(path), cache_dir=None)
+        oracle = TSP_INSTANCE(str(path), distance_mode="oracle", cache_dir=None).d
+        for i in range(len(nodes)):
+            for j in range(len(nodes)):
+                if i != j:
+                    assert problem.d[i, j] == reference(nodes[i], nodes[j])
+                    assert oracle[i][j] == oracle.row(i)[j] == problem.d[i, j]
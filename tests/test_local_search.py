@@ -0,0 +1,28 @@
+import random
+
+from candidates import nearest_neighbors
+from local_search import polish
+from solver import TSPSolver
+from tools import as_rows, f
+
+
+def test_polish(a280):
+    d = as_rows(a280.d)
+    neighbors = nearest_neighbors(a280.node_list, 8)
+    random.seed(1)
+    x = list(range(len(d)))
+    random.shuffle(x)
+    length = f(x, d)
+
+    delta = polish(x, d, neighbors)
+    assert sorted(x) == list(range(len(d)))
+    assert f(x, d) == length + delta
+    assert f(x, d) < 2579 * 1.15
+
+
+def test_solver_polish(berlin52):
+    d = as_rows(berlin52.d)
+    solver = TSPSolver(20, 0.1, 60, berlin52.d, polish=True, polish_every=20)
+    tour, length = solver.run()
+    assert length == f(tour, d) == solver.best
+    assert solver.f_x == f(solver.get_tour(), d)
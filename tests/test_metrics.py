@@ -0,0 +1,26 @@
+import json
+
+from metrics import SolverMetrics
+from solver import TSPSolver
+
+
+def test_solver_metrics(tmp_path, berlin52):
+    iterations = []
+    metrics = SolverMetrics(callback=lambda outer_cntr, m: iterations.append(outer_cntr), temperature_stats_every=5)
+    TSPSolver(50, 0.1, 20, berlin52.d, metrics=metrics).run()
+
+    assert iterations == list(range(1, 21))
+    assert metrics.moves_evaluated == 3 * 50 * 20
+    assert metrics.accepted_improving + metrics.accepted_worsening <= 50 * 20
+    assert sum(metrics.operator_wins.values()) == metrics.accepted_improving + metrics.accepted_worsening
+    assert len(metrics.iteration_time) == 20
+    assert [stats["iteration"] for stats in metrics.temperature_stats] == [5, 10, 15, 20]
+
+    metrics.save(str(tmp_path / "metrics.json"))
+    with open(tmp_path / "metrics.json") as file:
+        assert json.load(file) == json.loads(metrics.to_json())
+
+    # Ходы, примененные при генерации списка температур, не считаются победами операторов
+    metrics = SolverMetrics()
+    TSPSolver(50, 0.1, 0, berlin52.d, metrics=metrics).run()
+    assert sum(metrics.operator_wins.values()) == metrics.accepted_improving + metrics.accepted_worsening == 0
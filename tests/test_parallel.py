@@ -0,0 +1,36 @@
+import pytest
+
+from parallel import SharedMatrix, island_model, multi_start
+from tools import as_rows, f
+
+
+def test_shared_matrix(berlin52):
+    with SharedMatrix(berlin52.d) as shared:
+        shm, matrix = SharedMatrix.attach(shared.descriptor)
+        assert (matrix == berlin52.d).all()
+        del matrix
+        shm.close()
+
+
+def test_multi_start(berlin52):
+    result = multi_start(50, 0.1, 50, berlin52.d, runs=3, processes=2, seed=1)
+    assert len(result["runs"]) == 3
+    assert sorted(result["best_tour"]) == list(range(len(berlin52.d)))
+    assert result["best_length"] == f(result["best_tour"], as_rows(berlin52.d))
+    assert result["best_length"] == min(run["length"] for run in result["runs"])
+    # Запуски с одинаковым зерном воспроизводимы
+    assert multi_start(50, 0.1, 50, berlin52.d, runs=3, processes=2, seed=1)["runs"][0]["length"] == \
+        result["runs"][0]["length"]
+
+
+def test_island_model(berlin52):
+    result = island_model(50, 0.1, 60, berlin52.d, islands=3, migration_interval=20, share_temperatures=True, seed=1)
+    assert [run["island"] for run in result["runs"]] == [0, 1, 2]
+    assert sorted(result["best_tour"]) == list(range(len(berlin52.d)))
+    assert result["best_length"] == f(result["best_tour"], as_rows(berlin52.d))
+    # Острова обмениваются лучшими решениями, и отстающие острова перенимают их
+    assert sum(run["adopted"] for run in result["runs"]) > 0
+
+    # Ошибка на одном из островов не приводит к зависанию остальных островов и вызывающего процесса
+    with pytest.raises(RuntimeError):
+        island_model(0, 0.1, 60, berlin52.d, islands=2, migration_interval=20, seed=1)
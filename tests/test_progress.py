@@ -0,0 +1,36 @@
+import queue
+
+from progress import ProgressReceiver, ProgressSender
+from solver import TSPSolver
+
+
+def test_progress_stream(berlin52):
+    frames = queue.Queue(maxsize=1)
+    receiver = ProgressReceiver(frames)
+    sender = ProgressSender(frames, min_interval=0.0)
+    solver = TSPSolver(20, 0.1, 50, berlin52.d, progress=sender)
+
+    # Пока получатель не забирает кадры, солвер не ждет его, а новые кадры не отправляются
+    solver.advance(10)
+    first = receiver.poll()
+    assert first["outer_cntr"] == 1
+    assert len(first["added"]) == len(receiver.edges) == 52
+    assert receiver.poll() is None
+
+    # Последний кадр содержит только изменившиеся ребра, но получатель восстанавливает весь маршрут
+    solver.run()
+    last = receiver.poll()
+    assert last["outer_cntr"] == 50
+    assert len(last["added"]) == len(last["removed"]) < 52
+    tour = solver.get_tour()
+    assert receiver.edges == {tuple(sorted((tour[k - 1], tour[k]))) for k in range(len(tour))}
+
+
+def test_progress_throttling(berlin52):
+    frames = queue.Queue(maxsize=1)
+    receiver = ProgressReceiver(frames)
+    solver = TSPSolver(20, 0.1, 30, berlin52.d, progress=ProgressSender(frames, min_interval=3600))
+    solver.advance(10)
+    assert receiver.poll()["outer_cntr"] == 1
+    solver.advance(10)
+    assert receiver.poll() is None
@@ -0,0 +1,20 @@
+import json
+
+from rng import RandomStream
+
+
+def test_random_stream():
+    stream = RandomStream(seed=5, block_size=16)
+    pairs = [stream.pair(10) for _ in range(40)]
+    assert all(0 <= i < j < 10 for i, j in pairs)
+    assert all(0 <= stream.random() < 1 for _ in range(40))
+    assert all(stream.exponential() >= 0 for _ in range(40))
+    assert sorted(stream.permutation(10)) == list(range(10))
+
+    # Состояние сериализуется в JSON и восстанавливается посреди блока
+    state = json.loads(json.dumps(stream.get_state()))
+    expected = [(stream.pair(10), stream.random(), stream.exponential()) for _ in range(20)]
+    restored = RandomStream(seed=0, block_size=16)
+    restored.set_state(state)
+    assert [(restored.pair(10), restored.random(), restored.exponential()) for _ in range(20)] == expected
+    assert RandomStream(seed=5, block_size=16).pair(10) == pairs[0]
@@ -0,0 +1,177 @@
+import random
+import shutil
+
+import numpy as np
+import pytest
+
+from candidates import nearest_neighbors
+from instance import DistanceOracle
+from metrics import SolverMetrics
+from solver import TSPSolver
+from tools import as_rows, f
+
+
+def test_anytime_stopping(berlin52):
+
+    solver = TSPSolver(20, 0.1, 10 ** 6, berlin52.d)
+    solver.run(time_limit=0.05)
+    assert solver.stop_reason == "time_limit"
+    assert solver.outer_cntr < 10 ** 6
+
+    solver = TSPSolver(20, 0.1, 10 ** 6, berlin52.d)
+    solver.run(target=10 ** 9)
+    assert solver.stop_reason == "target"
+    assert solver.outer_cntr == 1
+
+    solver = TSPSolver(20, 0.1, 10 ** 6, berlin52.d)
+    solver.run(stagnation=5)
+    assert solver.stop_reason == "stagnation"
+
+    solver = TSPSolver(20, 0.1, 30, berlin52.d)
+    snapshots = list(solver.iterate(every=10))
+    assert [snapshot["outer_cntr"] for snapshot in snapshots] == [10, 20, 30]
+    assert solver.stop_reason == "outer_limit"
+    assert snapshots[-1]["f_x"] == solver.f_x
+
+
+def test_best_tour(berlin52):
+    d = as_rows(berlin52.d)
+    for tour_type in ("list", "tour"):
+        solver = TSPSolver(30, 0.3, 40, berlin52.d, tour_type=tour_type)
+        while solver.advance(1):
+            assert solver.best <= solver.f_x
+            assert f(solver.best_tour(), d) == solver.best
+        tour, length = solver.run()
+        assert f(tour, d) == length == solver.best
+
+
+def test_checkpoint_resume(tmp_path, berlin52):
+    checkpoint_file = str(tmp_path / "checkpoint.npz")
+
+    random.seed(3)
+    solver = TSPSolver(30, 0.1, 40, berlin52.d, checkpoint_file=checkpoint_file, checkpoint_every=15)
+    solver.advance(20)
+    solver.wait_checkpoint()
+    shutil.copy(checkpoint_file, checkpoint_file + ".15")
+    expected_tour, expected_length = solver.run()
+    solver.wait_checkpoint()
+
+    # Возобновление с итерации 15 дает тот же результат, что и запуск без прерывания
+    random.seed(100)
+    resumed = TSPSolver(30, 0.1, 40, berlin52.d, checkpoint_file=checkpoint_file + ".15", resume=True)
+    assert resumed.outer_cntr == 15
+    tour, length = resumed.run()
+    assert (tour, length) == (expected_tour, expected_length)
+    assert resumed.get_tour() == solver.get_tour()
+
+    # Вещественные значения целевой функции сохраняются без округления
+    d = np.asarray(berlin52.d) / 7
+    solver = TSPSolver(30, 0.1, 40, d, seed=4)
+    solver.advance(20)
+    solver.save_checkpoint(checkpoint_file)
+    resumed = TSPSolver(30, 0.1, 40, d, checkpoint_file=checkpoint_file, resume=True)
+    assert (resumed.f_x, resumed.best) == (solver.f_x, solver.best)
+    assert resumed.best_by_iterations == solver.best_by_iterations
+    assert resumed.run() == solver.run()
+
+
+def test_seed(berlin52):
+    candidates = nearest_neighbors(berlin52.node_list, 5)
+    results = []
+    for global_seed in (1, 2):
+        # Глобальное состояние модуля random не влияет на солвер с заданным зерном
+        random.seed(global_seed)
+        results.append(TSPSolver(30, 0.1, 30, berlin52.d, candidates=candidates, seed=7).run())
+    assert results[0] == results[1]
+    assert TSPSolver(30, 0.1, 30, berlin52.d, seed=8).run() != results[0]
+
+
+def test_adaptive_operator_selection(tmp_path, berlin52):
+    checkpoint_file = str(tmp_path / "checkpoint.npz")
+
+    # Пока все операторы активны, адаптивный выбор не меняет решение
+    assert TSPSolver(30, 0.1, 40, berlin52.d, operator_selection="adaptive", seed=5).run() == \
+        TSPSolver(30, 0.1, 40, berlin52.d, seed=5).run()
+
+    metrics = SolverMetrics()
+    solver = TSPSolver(
+        30, 0.1, 40, berlin52.d, operator_selection="adaptive", metrics=metrics, seed=5,
+        checkpoint_file=checkpoint_file, checkpoint_every=15
+    )
+    # Высокий порог заставляет пропускать операторы, побеждающие реже лучшего
+    solver.operator_bandit.threshold = 0.9
+    solver.advance(20)
+    solver.wait_checkpoint()
+    shutil.copy(checkpoint_file, checkpoint_file + ".15")
+    tour, length = solver.run()
+    solver.wait_checkpoint()
+    assert f(tour, berlin52.d) == length
+    # Активные операторы оцениваются на каждом шаге, пропускаемые - только на шагах исследования
+    assert 30 * 40 < metrics.moves_evaluated < 3 * 30 * 40
+    assert solver.operator_bandit.active and solver.operator_bandit.rare
+
+    # Статистика операторов сохраняется вместе с состоянием солвера
+    resumed = TSPSolver(
+        30, 0.1, 40, berlin52.d, operator_selection="adaptive", checkpoint_file=checkpoint_file + ".15", resume=True
+    )
+    # Порог меняется после загрузки статистики, поэтому активные операторы пересчитываются без новых данных
+    resumed.operator_bandit.threshold = 0.9
+    resumed.operator_bandit.update([0] * 3, [0] * 3)
+    assert resumed.run() == (tour, length)
+
+    with pytest.raises(ValueError):
+        TSPSolver(30, 0.1, 40, berlin52.d, operator_selection="adaptive", batch_size=8)
+    with pytest.raises(ValueError):
+        TSPSolver(30, 0.1, 40, berlin52.d, operator_selection="best")
+
+
+def test_candidate_moves(berlin52):
+    candidates = nearest_neighbors(berlin52.node_list, 5)
+    results = []
+    for tour_type in ("list", "tour"):
+        # Позиции городов в списке обновляются вместе с перестановкой, в том числе после локального поиска,
+        # поэтому ходы выбираются так же, как по позициям tour.Tour
+        solver = TSPSolver(
+            30, 0.1, 40, berlin52.d, tour_type=tour_type, candidates=candidates, polish_every=15, seed=3
+        )
+        tour, length = solver.run()
+        assert sorted(tour) == list(range(52))
+        assert f(tour, berlin52.d) == length
+        assert f(solver.get_tour(), berlin52.d) == solver.f_x
+        results.append((tour, length, solver.get_tour()))
+    assert results[0] == results[1]
+    assert TSPSolver(30, 0.1, 40, berlin52.d, candidates=candidates, uniform_share=1.0, seed=3).run() != results[0][:2]
+
+
+def test_batch_size(berlin52):
+    solver = TSPSolver(30, 0.1, 40, berlin52.d, batch_size=16, seed=2)
+    tour, length = solver.run()
+    assert sorted(tour) == list(range(52))
+    assert f(tour, berlin52.d) == length
+    assert f(solver.get_tour(), berlin52.d) == solver.f_x
+
+    with pytest.raises(ValueError):
+        TSPSolver(30, 0.1, 40, berlin52.d, batch_size=16, candidates=nearest_neighbors(berlin52.node_list, 5))
+
+
+def test_temperature_list_generation(a280):
+    oracle = DistanceOracle(a280.node_list, cache_size=len(a280.node_list))
+    for seed in (1, 2):
+        # Матрица и оракул расстояний дают одинаковые изначальные температуры и решение
+        solver = TSPSolver(300, 0.1, 0, a280.d, seed=seed)
+        sequential = TSPSolver(300, 0.1, 0, oracle, seed=seed)
+        assert solver.temperatures() == pytest.approx(sequential.temperatures())
+        assert solver.f_x == sequential.f_x == f(solver.get_tour(), as_rows(a280.d))
+        # Пакетная оценка ходов не меняет изначальные температуры: каждая получается из одной пары индексов
+        for batch_size in (16, 64):
+            batched = TSPSolver(300, 0.1, 0, a280.d, batch_size=batch_size, seed=seed)
+            assert batched.temperatures() == solver.temperatures()
+            assert batched.get_tour() == solver.get_tour()
+
+    # Для вещественной матрицы длина текущего решения не накапливает ошибку округления
+    d = np.asarray(a280.d) / 7
+    for batch_size in (1, 16):
+        solver = TSPSolver(30, 0.1, 20, d, batch_size=batch_size, seed=2)
+        assert solver.f_x == pytest.approx(f(solver.get_tour(), as_rows(d)))
+        solver.run()
+        assert solver.f_x == pytest.approx(f(solver.get_tour(), as_rows(d)))
@@ -1,5 +1,6 @@
 import random
 
+import numpy as np
 import pytest
 
 from tools import *
@@ -88,6 +89,102 @@ def test_f_swap():
         assert f_swap(old_perm, f(old_perm, d), new_perm, i, j, d) == f(new_perm, d)
 
 
+def test_delta_operators():
+    # Генерация матрицы расстояний (симметричная)
+    size = 30
+    d = [[0] * size for _ in range(size)]
+    for i in range(size):
+        for j in range(i):
+            d[i][j] = d[j][i] = random.randrange(1000)
+
+    old_perm = list(range(size))
+    random.shuffle(old_perm)
+
+    for i, j in ((0, size - 1), (0, 1), (5, 6), (0, size - 2), (3, size - 1), (2, size - 3), (4, 17)):
+        for op, delta, apply in (
+            (inverse_op, delta_inverse, apply_inverse),
+            (insert_op, delta_insert, apply_insert),
+            (swap_op, delta_swap, apply_swap),
+        ):
+            new_perm = op(old_perm, i, j)
+            assert f(old_perm, d) + delta(old_perm, i, j, d) == f(new_perm, d)
+            perm = old_perm[:]
+            apply(perm, i, j)
+            assert perm == new_perm
+
+
+def test_batch_deltas():
+    size = 30
+    d = np.array([[random.randrange(1000) for _ in range(size)] for __ in range(size)], dtype=np.int32)
+    perm = list(range(size))
+    random.shuffle(perm)
+    pairs = [(0, size - 1), (0, 1), (5, 6), (0, size - 2), (3, size - 1), (4, 17)]
+    i, j = np.array([p[0] for p in pairs]), np.array([p[1] for p in pairs])
+    deltas = batch_deltas(np.array(perm), i, j, d)
+    for k, (i_k, j_k) in enumerate(pairs):
+        for op, delta in enumerate((delta_inverse, delta_insert, delta_swap)):
+            # Инверсия вычисляется по формуле для симметричной задачи, как и delta_inverse
+            assert deltas[op, k] == delta(perm, i_k, j_k, d.tolist())
+        array_perm = np.array(perm)
+        apply_insert(array_perm, i_k, j_k)
+        assert array_perm.tolist() == insert_op(perm, i_k, j_k)
+
+    # Для вещественной матрицы изменения не округляются
+    real = d / 7
+    deltas = batch_deltas(np.array(perm), i, j, real)
+    assert deltas.dtype == np.float64
+    for k, (i_k, j_k) in enumerate(pairs):
+        for op, delta in enumerate((delta_inverse, delta_insert, delta_swap)):
+            assert deltas[op, k] == pytest.approx(delta(perm, i_k, j_k, real.tolist()))
+
+
+def test_temperature_list():
+    values = [random.uniform(0, 100) for _ in range(50)]
+    temperature_list = TemperatureList(values)
+    assert len(temperature_list) == 50
+    assert temperature_list.max() == max(values)
+    assert temperature_list.replace_max(1.5) == max(values)
+    values.remove(max(values))
+    values.append(1.5)
+    assert temperature_list.pop_max() == max(values)
+    values.remove(max(values))
+    temperature_list.push(200.0)
+    values.append(200.0)
+    assert sorted(temperature_list.values()) == sorted(values)
+    stats = temperature_list.stats()
+    assert stats["len"] == len(values)
+    assert stats["min"] == min(values) and stats["max"] == max(values)
+    assert stats["mean"] == pytest.approx(sum(values) / len(values))
+
+
+def test_path_costs():
+    size = 15
+    d = np.random.default_rng(1).integers(1, 1000, (size, size)).astype(np.int32)
+    rows = as_rows(d)
+    perm = list(range(size))
+    random.shuffle(perm)
+    costs = PathCosts(perm, d)
+    assert not is_symmetric(d) and is_symmetric(d + d.T)
+    for _ in range(500):
+        i, j = sorted(random.sample(range(size), 2))
+        assert costs.delta_inverse(perm, i, j, rows) == f(inverse_op(perm, i, j), rows) - f(perm, rows)
+        apply = random.choice((apply_inverse, apply_insert, apply_swap))
+        apply(perm, i, j)
+        costs.update(perm, i, j, random.choice((apply, None)))
+        assert costs.forward.tolist() == [f(perm[:k + 1], rows) - rows[perm[k]][perm[0]] for k in range(size)]
+
+    # Для вещественной матрицы суммы не округляются
+    real = d / 7
+    rows = as_rows(real)
+    costs = PathCosts(perm, real)
+    for _ in range(100):
+        i, j = sorted(random.sample(range(size), 2))
+        assert costs.delta_inverse(perm, i, j, rows) == pytest.approx(f(inverse_op(perm, i, j), rows) - f(perm, rows))
+        apply = random.choice((apply_inverse, apply_insert, apply_swap))
+        apply(perm, i, j)
+        costs.update(perm, i, j, random.choice((apply, None)))
+
+
 if __name__ == "__main__":
     random.seed(4)
     pytest.main()
@@ -0,0 +1,36 @@
+import pickle
+import random
+
+from tools import *
+from tour import Tour
+
+
+def test_tour_operators():
+    size = 100
+    perm = list(range(size))
+    random.shuffle(perm)
+    x = Tour(perm, block_size=7)
+
+    for _ in range(2000):
+        i, j = sorted(random.sample(range(size), 2))
+        op = random.choice((inverse_op, insert_op, swap_op))
+        perm = op(perm, i, j)
+        {inverse_op: apply_inverse, insert_op: apply_insert, swap_op: apply_swap}[op](x, i, j)
+        assert list(x) == perm
+        assert [x.position(city) for city in perm] == list(range(size))
+
+    assert len(x) == size
+    assert [x[k] for k in range(-size, size)] == perm + perm
+    assert pickle.loads(pickle.dumps(x)) == perm
+
+
+def test_tour_deltas():
+    size = 40
+    d = [[random.randrange(1000) for _ in range(size)] for __ in range(size)]
+    perm = list(range(size))
+    random.shuffle(perm)
+    x = Tour(perm)
+    assert f(x, d) == f(perm, d)
+    for i, j in ((0, size - 1), (3, 4), (5, 30)):
+        for delta in (delta_insert, delta_swap):
+            assert delta(x, i, j, d) == delta(perm, i, j, d)
@@ -1,28 +1,92 @@
-import functools
+import heapq
+from typing import Callable, Optional
 
+import numpy as np
 
-@functools.total_ordering
-class Temperature:
-    """
-    По умолчанию в python нет максимальной двоичной кучи, поэтому можно организовать минимальную двоичную кучу над
-    элементами, для которых все операции сравнения выдают противоположный их изначальному значению результат.
-    Элементы класса Temperature будут составлять максимальную двоичную кучу.
+
+class TemperatureList:
+    """Список температур с быстрым доступом к максимальной температуре.
+
+    Температуры хранятся в списке чисел с обратным знаком, организованном как минимальная двоичная куча
+    (сравнения чисел выполняются без вызова методов сравнения объектов). Максимум доступен
+    за O(1), замена максимума на новую температуру выполняется одной операцией heapreplace за O(log n).
+    Сумма температур поддерживается для вычисления среднего за O(1)
     """
 
-    def __init__(self, value):
-        self.value = value
+    def __init__(self, values=()):
+        """Инициализация списка температур
+
+        Args:
+            values (Iterable[float]): изначальные температуры
+        """
+        self.__heap = [-value for value in values]
+        heapq.heapify(self.__heap)
+        self.__sum = -sum(self.__heap)
+
+    def __len__(self):
+        return len(self.__heap)
+
+    def max(self) -> float:
+        """Возвращает максимальную температуру"""
+        return -self.__heap[0]
+
+    def push(self, value: float):
+        """Добавляет температуру"""
+        heapq.heappush(self.__heap, -value)
+        self.__sum += value
+
+    def pop_max(self) -> float:
+        """Удаляет и возвращает максимальную температуру"""
+        value = -heapq.heappop(self.__heap)
+        self.__sum -= value
+        return value
+
+    def replace_max(self, value: float) -> float:
+        """Заменяет максимальную температуру на value и возвращает удаленную температуру"""
+        removed = -heapq.heapreplace(self.__heap, -value)
+        self.__sum += value - removed
+        return removed
+
+    def values(self) -> list:
+        """Возвращает значения температур (в порядке кучи)"""
+        return [-value for value in self.__heap]
+
+    def stats(self) -> dict:
+        """Возвращает статистику температур (количество, минимум, максимум, среднее)"""
+        if not self.__heap:
+            return {"len": 0, "min": None, "max": None, "mean": None}
+        return {
+            "len": len(self.__heap),
+            "min": -max(self.__heap),
+            "max": -self.__heap[0],
+            "mean": self.__sum / len(self.__heap),
+        }
+
+
+def as_rows(d):
+    """Подготавливает матрицу расстояний для быстрого доступа вида d[i][j]
+
+    Индексирование numpy-массива из интерпретатора медленное, поэтому для numpy-матрицы возвращается список
+    memoryview на ее строки: данные не копируются, а d[i][j] возвращает обычный int
+
+    Args:
+        d: Матрица расстояний (numpy.ndarray или список списков)
 
-    # __lt__() для данного класса похож на __rt__() стандартных классов
-    # (функции операторов сравнений поменяны местами)
-    # Благодаря этому достигается возможность организации максимальной двоичной кучи встроенными средствами python
-    def __lt__(self, other):
-        return self.value > other.value
+    Returns:
+        Матрица, поддерживающая быстрый доступ d[i][j]
+    """
+    if isinstance(d, np.ndarray):
+        return [memoryview(row) for row in np.ascontiguousarray(d)]
+    return d
 
-    def __eq__(self, other):
-        return self.value == other.value
 
-    def __str__(self):
-        return str(self.value)
+def position(perm, city: int) -> int:
+    """Возвращает позицию города в перестановке (списке, numpy.ndarray или tour.Tour)"""
+    if isinstance(perm, list):
+        return perm.index(city)
+    if isinstance(perm, np.ndarray):
+        return int(np.flatnonzero(perm == city)[0])
+    return perm.position(city)
 
 
 def inverse_op(perm: list, i: int, j: int) -> list:
@@ -192,3 +256,268 @@ def f_swap(old_perm: list, f: float, new_perm: list, i: int, j: int, d: list) ->
         f += d[new_perm[k]][new_perm[(k + 1) % len(new_perm)]]
 
     return f
+
+
+def delta_inverse(perm: list, i: int, j: int, d: list) -> int:
+    """Вычисление изменения длины цикла при применении оператора инверсии без построения новой перестановки
+
+    Используются только 4 ребра, соседние с разворачиваемым участком (симметричная задача)
+
+    Args:
+        perm (list): Перестановка x
+        i (int): индекс
+        j (int): индекс (i < j)
+        d (list): Матрица расстояний
+
+    Returns:
+        Разность f(inverse_op(perm, i, j)) - f(perm)
+    """
+    n = len(perm)
+    # Инверсия всего списка не меняет цикл
+    if i == 0 and j == n - 1:
+        return 0
+    a, u, v, b = perm[i - 1], perm[i], perm[j], perm[(j + 1) % n]
+    return d[a][v] + d[u][b] - d[a][u] - d[v][b]
+
+
+def delta_insert(perm: list, i: int, j: int, d: list) -> int:
+    """Вычисление изменения длины цикла при применении оператора вставки без построения новой перестановки
+
+    Args:
+        perm (list): Перестановка x
+        i (int): индекс
+        j (int): индекс (i < j)
+        d (list): Матрица расстояний
+
+    Returns:
+        Разность f(insert_op(perm, i, j)) - f(perm)
+    """
+    n = len(perm)
+    # Вставка последнего города в начало списка не меняет цикл
+    if i == 0 and j == n - 1:
+        return 0
+    a, u, p, v, b = perm[i - 1], perm[i], perm[j - 1], perm[j], perm[(j + 1) % n]
+    return d[a][v] + d[v][u] + d[p][b] - d[a][u] - d[p][v] - d[v][b]
+
+
+def delta_swap(perm: list, i: int, j: int, d: list) -> int:
+    """Вычисление изменения длины цикла при применении оператора замены без построения новой перестановки
+
+    Args:
+        perm (list): Перестановка x
+        i (int): индекс
+        j (int): индекс (i < j)
+        d (list): Матрица расстояний
+
+    Returns:
+        Разность f(swap_op(perm, i, j)) - f(perm)
+    """
+    n = len(perm)
+    a, u, v, b = perm[i - 1], perm[i], perm[j], perm[(j + 1) % n]
+    if j == i + 1:
+        # Соседние города: ... a, u, v, b ... -> ... a, v, u, b ...
+        return d[a][v] + d[v][u] + d[u][b] - d[a][u] - d[u][v] - d[v][b]
+    c, p = perm[i + 1], perm[j - 1]
+    if i == 0 and j == n - 1:
+        # Города соседние через конец списка: ... p, v, u, c ... -> ... p, u, v, c ...
+        return d[p][u] + d[u][v] + d[v][c] - d[p][v] - d[v][u] - d[u][c]
+    return d[a][v] + d[v][c] + d[p][u] + d[u][b] - d[a][u] - d[u][c] - d[p][v] - d[v][b]
+
+
+def apply_inverse(perm, i: int, j: int):
+    """Применяет оператор инверсии к перестановке (списку, numpy.ndarray или tour.Tour) на месте (аналог inverse_op)"""
+    if isinstance(perm, (list, np.ndarray)):
+        perm[i:j + 1] = perm[i:j + 1][::-1]
+    else:
+        perm.inverse(i, j)
+
+
+def apply_insert(perm, i: int, j: int):
+    """Применяет оператор вставки к перестановке (списку, numpy.ndarray или tour.Tour) на месте (аналог insert_op)"""
+    if isinstance(perm, list):
+        perm.insert(i, perm.pop(j))
+    elif isinstance(perm, np.ndarray):
+        city = perm[j]
+        perm[i + 1:j + 1] = perm[i:j]
+        perm[i] = city
+    else:
+        perm.insert(i, j)
+
+
+def apply_swap(perm, i: int, j: int):
+    """Применяет оператор замены к перестановке (списку, numpy.ndarray или tour.Tour) на месте (аналог swap_op)"""
+    if isinstance(perm, (list, np.ndarray)):
+        perm[i], perm[j] = perm[j], perm[i]
+    else:
+        perm.swap(i, j)
+
+
+def is_symmetric(d) -> bool:
+    """Проверяет, симметрична ли матрица расстояний (оракул расстояний всегда симметричен)"""
+    if isinstance(d, (np.ndarray, list)):
+        d = np.asarray(d)
+        return bool(np.array_equal(d, d.T))
+    return True
+
+
+class PathCosts:
+    """Префиксные суммы стоимостей пути вдоль перестановки в прямом и обратном направлениях.
+
+    Используются в несимметричной задаче (ATSP), где разворот участка меняет стоимость всех его ребер.
+    forward[k] - стоимость пути perm[0] -> perm[1] -> ... -> perm[k], backward[k] - стоимость того же пути,
+    пройденного в обратном направлении. Изменение длины цикла при инверсии вычисляется за O(1) (delta_inverse),
+    а после применения хода суммы пересчитываются только на измененном участке, хвост сдвигается на константу
+    (update).
+
+    Typical usage example:
+        costs = PathCosts(perm, d)
+        delta = costs.delta_inverse(perm, i, j, d)
+        apply_inverse(perm, i, j)
+        costs.update(perm, i, j, apply_inverse)
+
+    Attributes:
+        forward (numpy.ndarray): префиксные суммы стоимостей в прямом направлении (int64 или вещественный тип
+            матрицы)
+        backward (numpy.ndarray): префиксные суммы стоимостей в обратном направлении
+    """
+    def __init__(self, perm, d):
+        """Инициализация префиксных сумм
+
+        Args:
+            perm (list | numpy.ndarray): перестановка
+            d (numpy.ndarray | List[List[float]]): матрица расстояний
+        """
+        self.__matrix = np.asarray(d)
+        self.__rows = as_rows(self.__matrix)
+        n = len(perm)
+        # Для целочисленной матрицы суммы хранятся в int64 (без переполнения), для вещественной - в ее типе
+        dtype = np.result_type(self.__matrix.dtype, np.int64)
+        self.forward = np.zeros(n, dtype=dtype)
+        self.backward = np.zeros(n, dtype=dtype)
+        # memoryview для быстрого доступа к отдельным элементам из интерпретатора (см. as_rows)
+        self.__forward = memoryview(self.forward)
+        self.__backward = memoryview(self.backward)
+        self.update(perm, 0, n - 1)
+
+    def update(self, perm, i: int, j: int, apply: Optional[Callable] = None):
+        """Пересчитывает суммы после применения оператора к перестановке на позициях с i по j (i < j)
+
+        Args:
+            perm (list | numpy.ndarray): перестановка после применения оператора
+            i (int): индекс
+            j (int): индекс (i < j)
+            apply (Optional[Callable]): примененный оператор (apply_inverse | apply_insert | apply_swap). Для них
+                суммы на участке получаются из прежних сумм разворотом или сдвигом, а из матрицы берутся только
+                стоимости ребер на границах участка. None - участок пересчитывается по матрице. По умолчанию None
+        """
+        n = len(perm)
+        if apply not in (apply_inverse, apply_insert, apply_swap):
+            lo, hi = max(i - 1, 0), min(j + 1, n - 1)
+            cities = np.asarray(perm[lo:hi + 1], dtype=np.int64)
+            for prefix, costs in (
+                    (self.forward, self.__matrix[cities[:-1], cities[1:]]),
+                    (self.backward, self.__matrix[cities[1:], cities[:-1]]),
+            ):
+                old_hi = prefix[hi]
+                prefix[lo + 1:hi + 1] = prefix[lo] + np.cumsum(costs)
+                prefix[hi + 1:] += prefix[hi] - old_hi
+            return
+
+        rows = self.__rows
+        if apply is apply_inverse:
+            # Стоимость развернутого участка в одном направлении равна прежней стоимости в другом
+            reversed_segments = (self.backward[i:j + 1].copy(), self.forward[i:j + 1].copy())
+        for direction, (prefix, view) in enumerate(((self.forward, self.__forward), (self.backward, self.__backward))):
+            def cost(a, b):
+                return rows[a][b] if direction == 0 else rows[b][a]
+
+            start = view[i - 1] + cost(perm[i - 1], perm[i]) if i > 0 else 0
+            if apply is apply_inverse:
+                segment = reversed_segments[direction]
+                prefix[i:j + 1] = start + segment[-1] - segment[::-1]
+            elif apply is apply_insert:
+                # Участок с i по j - 1 сдвинулся на одну позицию вправо
+                second = start + cost(perm[i], perm[i + 1])
+                prefix[i + 2:j + 1] = second + prefix[i + 1:j] - view[i]
+                view[i], view[i + 1] = start, second
+            elif j == i + 1:
+                view[i], view[j] = start, start + cost(perm[i], perm[j])
+            else:
+                # Ребра между позициями i + 1 и j - 1 не изменились
+                second = start + cost(perm[i], perm[i + 1])
+                prefix[i + 2:j] += second - view[i + 1]
+                view[i], view[i + 1] = start, second
+                view[j] = view[j - 1] + cost(perm[j - 1], perm[j])
+            # Ребра после позиции j не изменились, поэтому хвост сдвигается на константу
+            if j + 1 < n:
+                prefix[j + 1:] += view[j] + cost(perm[j], perm[j + 1]) - view[j + 1]
+
+    def delta_inverse(self, perm: list, i: int, j: int, d: list) -> int:
+        """Вычисление изменения длины цикла при применении оператора инверсии в несимметричной задаче
+
+        Args:
+            perm (list): Перестановка x
+            i (int): индекс
+            j (int): индекс (i < j)
+            d (list): Матрица расстояний
+
+        Returns:
+            Разность f(inverse_op(perm, i, j)) - f(perm)
+        """
+        n = len(perm)
+        forward, backward = self.__forward, self.__backward
+        # Разность стоимостей участка, пройденного в обратном и в прямом направлениях
+        reversed_cost = backward[j] - backward[i] - forward[j] + forward[i]
+        a, u, v, b = perm[i - 1], perm[i], perm[j], perm[(j + 1) % n]
+        # Инверсия всего списка разворачивает весь цикл, включая ребро v -> u
+        if i == 0 and j == n - 1:
+            return reversed_cost + d[u][v] - d[v][u]
+        return d[a][v] + d[u][b] - d[a][u] - d[v][b] + reversed_cost
+
+
+def batch_deltas(perm: np.ndarray, i: np.ndarray, j: np.ndarray, d: np.ndarray) -> np.ndarray:
+    """Векторизованное вычисление изменений длины цикла для многих ходов сразу
+
+    Аналог delta_inverse, delta_insert и delta_swap для массивов индексов
+
+    Args:
+        perm (numpy.ndarray): Перестановка x
+        i (numpy.ndarray): массив индексов
+        j (numpy.ndarray): массив индексов (i < j поэлементно)
+        d (numpy.ndarray): Матрица расстояний
+
+    Returns:
+        Массив размера (3, len(i)): изменения целевой функции для операторов инверсии, вставки и замены
+        (int64 для целочисленной матрицы, для вещественной - ее тип)
+    """
+    n = len(perm)
+    a, u, v, b = perm[i - 1], perm[i], perm[j], perm[(j + 1) % n]
+    c, p = perm[(i + 1) % n], perm[j - 1]
+    # Целочисленная матрица суммируется в int64 (без переполнения), вещественная - в своем типе
+    dtype = np.result_type(d.dtype, np.int64)
+    d_av, d_ua, d_au, d_vb = d[a, v].astype(dtype), d[u, b], d[a, u], d[v, b]
+    whole = (i == 0) & (j == n - 1)
+    adjacent = j == i + 1
+
+    deltas = np.empty((3, len(i)), dtype=dtype)
+    deltas[0] = np.where(whole, 0, d_av + d_ua - d_au - d_vb)
+    deltas[1] = np.where(whole, 0, d_av + d[v, u] + d[p, b] - d_au - d[p, v] - d_vb)
+    deltas[2] = np.where(
+        adjacent,
+        d_av + d[v, u] + d[u, b] - d_au - d[u, v] - d_vb,
+        np.where(
+            whole,
+            d[p, u].astype(dtype) + d[u, v] + d[v, c] - d[p, v] - d[v, u] - d[u, c],
+            d_av + d[v, c] + d[p, u] + d_ua - d_au - d[u, c] - d[p, v] - d_vb,
+        ),
+    )
+
+    return deltas
+
+
+# Пары (вычисление изменения целевой функции, применение) для операторов инверсии, вставки и замены
+OPERATORS = (
+    (delta_inverse, apply_inverse),
+    (delta_insert, apply_insert),
+    (delta_swap, apply_swap),
+)
@@ -0,0 +1,171 @@
+import bisect
+import math
+from typing import Iterable, List, Optional
+
+
+class _Block:
+    """Блок двухуровневого списка: участок маршрута, флаг его отложенного разворота и номер блока в маршруте"""
+    __slots__ = ("items", "reversed", "ordinal")
+
+    def __init__(self, items: list, reversed_: bool = False):
+        self.items = items
+        self.reversed = reversed_
+        self.ordinal = 0
+
+
+class Tour:
+    """Маршрут коммивояжера, хранящийся в виде двухуровневого списка.
+
+    Маршрут разбит на блоки длиной около sqrt(n). Каждый блок хранит свой участок маршрута в массиве и флаг
+    разворота, поэтому инверсия участка маршрута разворачивает только порядок блоков и их флаги, а вставка
+    и замена затрагивают не больше двух блоков. Для каждого города хранятся блок, в котором он находится, и
+    индекс в массиве блока, а для блока - его номер, поэтому позиция города находится за O(1). Доступ по индексу
+    ищет блок бинарным поиском по началам блоков, а операторы выполняются за O(sqrt(n)).
+
+    Поддерживает доступ x[k] (в том числе с отрицательными индексами), len(x) и перебор городов, поэтому
+    может использоваться в TSPSolver и функциях модуля tools вместо списка.
+
+    Typical usage example:
+        x = Tour(permutation)
+        x.inverse(i, j)
+        k = x.position(city)
+    """
+    def __init__(self, cities: Iterable[int], block_size: Optional[int] = None):
+        """Инициализация маршрута
+
+        Args:
+            cities (Iterable[int]): перестановка городов 0..n-1
+            block_size (Optional[int]): размер блока. По умолчанию sqrt(n)
+        """
+        cities = list(cities)
+        self.__n = len(cities)
+        self.__block_size = block_size or max(8, math.isqrt(self.__n))
+        self.__block_of = [None] * self.__n  # блок, в котором находится город
+        self.__offset = [0] * self.__n  # индекс города в массиве его блока
+        self.__rebuild(cities)
+
+    def __rebuild(self, cities: List[int]):
+        """Заново разбивает маршрут на блоки одинакового размера"""
+        size = self.__block_size
+        self.__blocks = [_Block(cities[k:k + size]) for k in range(0, len(cities), size)]
+        for block in self.__blocks:
+            self.__index_block(block)
+        self.__update_starts()
+
+    def __index_block(self, block: _Block):
+        """Запоминает для городов блока сам блок и их индексы в его массиве"""
+        block_of, offset = self.__block_of, self.__offset
+        for index, city in enumerate(block.items):
+            block_of[city] = block
+            offset[city] = index
+
+    def __update_starts(self):
+        """Пересчитывает позиции начала блоков и их номера"""
+        starts, start = [], 0
+        for ordinal, block in enumerate(self.__blocks):
+            block.ordinal = ordinal
+            starts.append(start)
+            start += len(block.items)
+        self.__starts = starts
+
+    def __locate(self, k: int):
+        """Возвращает номер блока, содержащего позицию k, и индекс позиции внутри массива блока"""
+        b = bisect.bisect_right(self.__starts, k) - 1
+        block = self.__blocks[b]
+        local = k - self.__starts[b]
+        return b, (len(block.items) - 1 - local if block.reversed else local)
+
+    def __split(self, k: int) -> int:
+        """Гарантирует, что позиция k является началом блока, и возвращает номер этого блока"""
+        if k >= self.__n:
+            return len(self.__blocks)
+        b = bisect.bisect_right(self.__starts, k) - 1
+        local = k - self.__starts[b]
+        if local == 0:
+            return b
+        block = self.__blocks[b]
+        if block.reversed:
+            block.items.reverse()
+            block.reversed = False
+            self.__index_block(block)
+        tail = _Block(block.items[local:])
+        del block.items[local:]
+        self.__index_block(tail)
+        self.__blocks.insert(b + 1, tail)
+        self.__starts.insert(b + 1, k)
+        for ordinal in range(b + 1, len(self.__blocks)):
+            self.__blocks[ordinal].ordinal = ordinal
+        return b + 1
+
+    def __len__(self):
+        return self.__n
+
+    def __getitem__(self, k: int) -> int:
+        if k < 0:
+            k += self.__n
+        b, index = self.__locate(k)
+        return self.__blocks[b].items[index]
+
+    def __iter__(self):
+        for block in self.__blocks:
+            yield from (reversed(block.items) if block.reversed else block.items)
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    def __repr__(self):
+        return f"Tour({list(self)})"
+
+    def __getstate__(self):
+        return {"cities": list(self), "block_size": self.__block_size}
+
+    def __setstate__(self, state):
+        self.__init__(state["cities"], state["block_size"])
+
+    def position(self, city: int) -> int:
+        """Возвращает позицию города в маршруте"""
+        block = self.__block_of[city]
+        index = self.__offset[city]
+        return self.__starts[block.ordinal] + (len(block.items) - 1 - index if block.reversed else index)
+
+    def inverse(self, i: int, j: int):
+        """Разворачивает участок маршрута с позиции i по позицию j (i < j), аналог tools.inverse_op"""
+        a = self.__split(i)
+        b = self.__split(j + 1)
+        segment = self.__blocks[a:b]
+        segment.reverse()
+        for block in segment:
+            block.reversed = not block.reversed
+        self.__blocks[a:b] = segment
+        self.__update_starts()
+        # Каждая инверсия добавляет не больше 2 блоков, поэтому время от времени блоки перестраиваются
+        if len(self.__blocks) > 2 * (self.__n // self.__block_size + 1):
+            self.__rebuild(list(self))
+
+    def insert(self, i: int, j: int):
+        """Перемещает город с позиции j на позицию i (i < j), аналог tools.insert_op"""
+        b, index = self.__locate(j)
+        block = self.__blocks[b]
+        city = block.items.pop(index)
+        if block.items:
+            self.__index_block(block)
+        else:
+            del self.__blocks[b]
+        self.__update_starts()
+
+        b, index = self.__locate(i)
+        block = self.__blocks[b]
+        block.items.insert(index + 1 if block.reversed else index, city)
+        self.__index_block(block)
+        self.__update_starts()
+        if len(block.items) > 2 * self.__block_size:
+            self.__split(self.__starts[b] + len(block.items) // 2)
+
+    def swap(self, i: int, j: int):
+        """Меняет местами города на позициях i и j, аналог tools.swap_op"""
+        b1, index1 = self.__locate(i)
+        b2, index2 = self.__locate(j)
+        block1, block2 = self.__blocks[b1], self.__blocks[b2]
+        block1.items[index1], block2.items[index2] = block2.items[index2], block1.items[index1]
+        self.__block_of[block1.items[index1]], self.__offset[block1.items[index1]] = block1, index1
+        self.__block_of[block2.items[index2]], self.__offset[block2.items[index2]] = block2, index2
@@ -1,24 +1,30 @@
 import multiprocessing
 import os
-import threading
+import time
 import tkinter as tk
 from tkinter import messagebox
 from tkinter import ttk
 
+import construction
 import instance
 import solver
+from progress import ProgressReceiver, ProgressSender
 
 
 class Interface(tk.Tk):
+    # Интервал между обновлениями холста в миллисекундах
+    REDRAW_INTERVAL = 50
+
     def __init__(self):
         super().__init__()
         self.__set_title_and_size()
 
         # переменные
-        self.output_pipe, self.input_pipe = None, None  # выход и вход трубы для общения между процессами
+        self.frames = None  # очередь кадров прогресса решения от процесса решения
         self.node_list = None  # объявление списка, содержащего координаты вершин для решения
-        self.lines = []  # список, содержащий все линии решения (ребра между узлами)
-        self.canvas_thread = None  # поток для рисования на canvas
+        self.receiver = None  # получатель кадров прогресса решения
+        self.lines = {}  # линии решения на холсте по ребрам (a, b), a < b
+        self.redraw_id = None  # идентификатор запланированного обновления холста
         self.solution_process = None  # процесс решения
 
         # Виджеты
@@ -34,13 +40,17 @@ class Interface(tk.Tk):
         self.p0_entry = ttk.Entry(self.menu)  # поле ввода изначальной вероятности
         self.number_of_loops_label = ttk.Label(self.menu, text="Количество итераций:")
         self.number_of_loops_entry = ttk.Entry(self.menu)  # поле ввода количества итераций
+        self.initial_tour_label = ttk.Label(self.menu, text="Изначальный маршрут:")
+        self.initial_tour = ttk.Combobox(self.menu, state="readonly")  # выпадающий список с методом построения
         self.labels_frame = ttk.Frame(self.menu)
         self.outer_cntr_label = ttk.Label(self.labels_frame, text="Количество итераций:")
         self.best_solution_label = ttk.Label(self.labels_frame, text="Найденное решение:")
         self.optimum_label = ttk.Label(self.labels_frame, text="Оптимальное решение:")
+        self.construction_label = ttk.Label(self.labels_frame, text="Построение маршрута:")
         self.outer_cntr_value = ttk.Label(self.labels_frame, text="0")  # количество пройденных итераций
         self.best_solution_value = ttk.Label(self.labels_frame, text="None")  # значение лучшего решения
         self.optimum_value = ttk.Label(self.labels_frame, text="None")  # значение лучшего известного решения
+        self.construction_value = ttk.Label(self.labels_frame, text="None")  # время построения маршрута
 
         self.launch = ttk.Button(self.menu, text="Запуск", command=self.__get_process)  # кнопка запуска
         self.canvas = tk.Canvas(bg="white")  # холст, на котором будет отрисовываться визуализация
@@ -69,6 +79,8 @@ class Interface(tk.Tk):
         options = os.listdir(os.path.dirname(__file__) + r"/data/benchmarks/")
         self.files.configure(values=options)
         self.files.insert(tk.END, options[0])
+        self.initial_tour.configure(values=["random", *construction.CONSTRUCTORS])
+        self.initial_tour.set("random")
 
         # Упаковка
         self.menu.pack(fill=tk.Y, side=tk.LEFT)
@@ -79,14 +91,18 @@ class Interface(tk.Tk):
         self.p0_entry.pack()
         self.number_of_loops_label.pack()
         self.number_of_loops_entry.pack()
+        self.initial_tour_label.pack()
+        self.initial_tour.pack()
 
         self.labels_frame.pack()
         self.outer_cntr_label.grid(row=0, column=0, sticky=tk.W)
         self.best_solution_label.grid(row=1, column=0, sticky=tk.W)
         self.optimum_label.grid(row=2, column=0, sticky=tk.W)
+        self.construction_label.grid(row=3, column=0, sticky=tk.W)
         self.outer_cntr_value.grid(row=0, column=1, sticky=tk.E)
         self.best_solution_value.grid(row=1, column=1, sticky=tk.E)
         self.optimum_value.grid(row=2, column=1, sticky=tk.E)
+        self.construction_value.grid(row=3, column=1, sticky=tk.E)
 
         self.launch.pack(side=tk.BOTTOM)
 
@@ -96,20 +112,26 @@ class Interface(tk.Tk):
         # Если уже был запущен процесс решения, то нужно его остановить и запустить новый
         if self.solution_process and self.solution_process.is_alive():
             self.solution_process.kill()
+        if self.redraw_id is not None:
+            self.after_cancel(self.redraw_id)
+            self.redraw_id = None
         # Непосредственно запуск процесса решения
         try:
-            # Создание трубы для общения между процессом с отрисовкой визуализации и процессом с решением задачи
-            self.output_pipe, self.input_pipe = multiprocessing.Pipe()
+            # Создание очереди кадров прогресса между процессом решения задачи и процессом с визуализацией.
+            # Очередь вмещает один кадр: пока он не отрисован, солвер не отправляет новые кадры
+            self.frames = multiprocessing.Queue(maxsize=1)
 
             # Получение информации о текущей задаче
             problem = instance.TSP_INSTANCE(f"data/benchmarks/{self.files.get()}")
+            if problem.node_list is None:
+                # Задача с явной матрицей расстояний без DISPLAY_DATA_SECTION: городам негде находиться на холсте
+                messagebox.showerror("Ошибка!", "Для визуализации в задаче должны быть заданы координаты городов!")
+                return
             self.node_list = problem.node_list  # координаты узлов
             # Получение значения оптимума для текущей задачи
             self.__get_optimal_value()
-
-            # Запуск потока, который будет обновлять информацию в окне
-            self.canvas_thread = threading.Thread(target=self.__draw_current_solution, daemon=True)
-            self.canvas_thread.start()
+            # Построение изначального маршрута в этом процессе, чтобы сразу показать время построения
+            initial_tour = self.__construct_initial_tour()
 
             # Запуск процесса, который будет заниматься решением задачи
             self.solution_process = multiprocessing.Process(
@@ -119,23 +141,39 @@ class Interface(tk.Tk):
                     float(self.p0_entry.get()),
                     int(self.number_of_loops_entry.get()),
                     problem.d,
-                    self.input_pipe
+                    initial_tour,
+                    self.frames
                 ),
                 daemon=True
             )
             self.solution_process.start()
+
+            # Подготовка холста и запуск периодического обновления информации в окне
+            self.__prepare_canvas()
+            self.receiver = ProgressReceiver(self.frames)
+            self.__draw_current_solution()
         except ValueError:
             messagebox.showerror("Ошибка!", "Количество итераций должно быть целым числом!")
 
     def __get_optimal_value(self):
-        with open("data/optimalSolutions.txt", "r") as optimums:
-            for string in optimums.readlines():
-                cur_name, answer = map(lambda s: s.strip(), string.split(":"))
-                if f"{cur_name}.tsp" == self.files.get():
-                    self.optimum_value.configure(text=answer)
-
-    def __draw_current_solution(self):
+        optimums = instance.read_optimal_solutions()
+        name = os.path.splitext(self.files.get())[0]
+        if name in optimums:
+            self.optimum_value.configure(text=str(optimums[name]))
+
+    def __construct_initial_tour(self):
+        method = self.initial_tour.get()
+        if method not in construction.CONSTRUCTORS:
+            self.construction_value.configure(text="None")
+            return "random"  # случайная перестановка строится солвером
+        start = time.perf_counter()
+        tour = construction.CONSTRUCTORS[method](self.node_list)
+        self.construction_value.configure(text=f"{(time.perf_counter() - start) * 1000:.1f} мс")
+        return tour
+
+    def __prepare_canvas(self):
         self.canvas.delete(tk.ALL)
+        self.lines = {}
         # Вычисление коэффициентов - отношений между размером холста и требуемым размером для отображения координат
         # (Будут использоваться для вычисления относительных координат точек на холсте)
         min_x = min(self.node_list, key=lambda item: item[0])[0]
@@ -158,25 +196,32 @@ class Interface(tk.Tk):
         for x, y in self.node_list:
             self.canvas.create_oval(x-2, y-2, x+2, y+2, fill="black")
 
-        # Отрисовка линий на холсте
-        while True:
-            try:
-                x, outer_cntr, best = self.output_pipe.recv()
-                self.outer_cntr_value.configure(text=str(outer_cntr))
-                self.best_solution_value.configure(text=str(best))
-                for line in self.lines:
-                    self.canvas.delete(line)
-                for ind in range(len(x)):
-                    self.lines.append(
-                        self.canvas.create_line(
-                            *self.node_list[x[ind]],
-                            *self.node_list[x[(ind+1) % len(x)]],
-                            fill="black"
-                        )
-                    )
-            except Exception:
-                break
+    def __draw_current_solution(self):
+        # Вызывается в главном цикле Tk; все кадры, пришедшие с прошлого вызова, объединяются в одно обновление
+        self.redraw_id = None
+        frame = self.receiver.poll()
+        if frame is None and not self.solution_process.is_alive():
+            # Процесс мог отправить последний кадр и завершиться уже после проверки очереди, поэтому очередь
+            # проверяется еще раз после его завершения
+            frame = self.receiver.poll()
+            if frame is None:
+                return  # решение завершено, и последний кадр уже отрисован
+        if frame is not None:
+            self.outer_cntr_value.configure(text=str(frame["outer_cntr"]))
+            self.best_solution_value.configure(text=str(frame["best"]))
+            # Линии удаленных ребер переиспользуются для добавленных ребер, остальные линии не изменяются
+            free = [self.lines.pop(edge) for edge in frame["removed"]]
+            for a, b in frame["added"]:
+                line = free.pop() if free else self.canvas.create_line(0, 0, 0, 0, fill="black")
+                self.canvas.coords(line, *self.node_list[a], *self.node_list[b])
+                self.lines[(a, b)] = line
+            for line in free:
+                self.canvas.delete(line)
+
+        self.redraw_id = self.after(self.REDRAW_INTERVAL, self.__draw_current_solution)
 
     @staticmethod
-    def get_solution(temp_len, p0, outer_limit, d, input_pipe):
-        solver.TSPSolver(temp_len, p0, outer_limit, d, input_pipe=input_pipe).run()
+    def get_solution(temp_len, p0, outer_limit, d, initial_tour, frames):
+        solver.TSPSolver(
+            temp_len, p0, outer_limit, d, initial_tour=initial_tour, progress=ProgressSender(frames)
+        ).run()